@@ -0,0 +1,88 @@
+"""Baseline schema: users, jobs, posts and job_logs as originally created by create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+Databases that were already created by Base.metadata.create_all before migrations existed
+should be marked with `alembic stamp 0001` and then upgraded.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('password_hash', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String()),
+        sa.Column('user_tier', sa.String()),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('group_urls', sa.JSON()),
+        sa.Column('status', sa.String()),
+        sa.Column('config', sa.JSON()),
+        sa.Column('total_posts', sa.Integer()),
+        sa.Column('last_run', sa.DateTime()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('ix_jobs_id', 'jobs', ['id'])
+
+    op.create_table(
+        'posts',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('job_id', sa.Integer(), sa.ForeignKey('jobs.id')),
+        sa.Column('post_id', sa.String()),
+        sa.Column('group_name', sa.String()),
+        sa.Column('author_name', sa.String()),
+        sa.Column('author_url', sa.String()),
+        sa.Column('content', sa.Text()),
+        sa.Column('timestamp', sa.DateTime()),
+        sa.Column('likes', sa.Integer()),
+        sa.Column('comments', sa.Integer()),
+        sa.Column('shares', sa.Integer()),
+        sa.Column('post_url', sa.String()),
+        sa.Column('media_urls', sa.JSON()),
+        sa.Column('scraped_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('ix_posts_id', 'posts', ['id'])
+    op.create_index('ix_posts_post_id', 'posts', ['post_id'], unique=True)
+
+    op.create_table(
+        'job_logs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('job_id', sa.Integer(), sa.ForeignKey('jobs.id')),
+        sa.Column('level', sa.String()),
+        sa.Column('message', sa.Text()),
+        sa.Column('timestamp', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('ix_job_logs_id', 'job_logs', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_table('job_logs')
+    op.drop_table('posts')
+    op.drop_table('jobs')
+    op.drop_table('users')
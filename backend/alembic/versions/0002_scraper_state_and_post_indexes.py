@@ -0,0 +1,118 @@
+"""Scraper state tables, job scheduling columns and keyset-pagination indexes on posts
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:10:00
+
+Adds posts.content_hash, selector_stats, group_cursors, jobs.next_run_at, jobs.checkpoint and the
+(job_id, ..., scraped_at, id) composite indexes. The API still runs create_all on startup, which
+may already have created the new tables, so each step checks what exists first.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+POST_INDEXES = {
+    'ix_posts_job_scraped': ['job_id', 'scraped_at', 'id'],
+    'ix_posts_job_group_scraped': ['job_id', 'group_name', 'scraped_at', 'id'],
+    'ix_posts_job_author_scraped': ['job_id', 'author_name', 'scraped_at', 'id'],
+}
+
+
+class _OfflineInspector:
+    """Offline (--sql) runs cannot inspect the database, so they assume a 0001 schema"""
+
+    def get_table_names(self):
+        return ['users', 'jobs', 'posts', 'job_logs']
+
+    def get_columns(self, table):
+        return []
+
+    def get_indexes(self, table):
+        return []
+
+
+def _columns(inspector, table: str) -> set:
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def _indexes(inspector, table: str) -> set:
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    inspector = _OfflineInspector() if context.is_offline_mode() else sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if 'content_hash' not in _columns(inspector, 'posts'):
+        with op.batch_alter_table('posts') as batch:
+            batch.add_column(sa.Column('content_hash', sa.String()))
+    existing = _indexes(inspector, 'posts')
+    if 'ix_posts_content_hash' not in existing:
+        op.create_index('ix_posts_content_hash', 'posts', ['content_hash'])
+    for name, columns in POST_INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'posts', columns)
+
+    job_columns = _columns(inspector, 'jobs')
+    with op.batch_alter_table('jobs') as batch:
+        if 'next_run_at' not in job_columns:
+            batch.add_column(sa.Column('next_run_at', sa.DateTime()))
+        if 'checkpoint' not in job_columns:
+            batch.add_column(sa.Column('checkpoint', sa.JSON()))
+    if 'ix_jobs_next_run_at' not in _indexes(inspector, 'jobs'):
+        op.create_index('ix_jobs_next_run_at', 'jobs', ['next_run_at'])
+
+    if 'selector_stats' not in tables:
+        op.create_table(
+            'selector_stats',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('scope', sa.String()),
+            sa.Column('kind', sa.String()),
+            sa.Column('selector', sa.String()),
+            sa.Column('hits', sa.Integer()),
+            sa.Column('misses', sa.Integer()),
+            sa.Column('score', sa.Float()),
+            sa.Column('last_hit', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+            sa.UniqueConstraint('scope', 'kind', 'selector', name='uq_selector_stats_scope_kind_selector'),
+        )
+        op.create_index('ix_selector_stats_id', 'selector_stats', ['id'])
+        op.create_index('ix_selector_stats_scope', 'selector_stats', ['scope'])
+
+    if 'group_cursors' not in tables:
+        op.create_table(
+            'group_cursors',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('job_id', sa.Integer(), sa.ForeignKey('jobs.id')),
+            sa.Column('group_url', sa.String(), nullable=False),
+            sa.Column('newest_post_id', sa.String()),
+            sa.Column('newest_post_timestamp', sa.DateTime()),
+            sa.Column('last_scraped_at', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+            sa.UniqueConstraint('job_id', 'group_url', name='uq_group_cursors_job_group'),
+        )
+        op.create_index('ix_group_cursors_id', 'group_cursors', ['id'])
+        op.create_index('ix_group_cursors_job_id', 'group_cursors', ['job_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('group_cursors')
+    op.drop_table('selector_stats')
+    op.drop_index('ix_jobs_next_run_at', table_name='jobs')
+    with op.batch_alter_table('jobs') as batch:
+        batch.drop_column('checkpoint')
+        batch.drop_column('next_run_at')
+    for name in POST_INDEXES:
+        op.drop_index(name, table_name='posts')
+    op.drop_index('ix_posts_content_hash', table_name='posts')
+    with op.batch_alter_table('posts') as batch:
+        batch.drop_column('content_hash')
@@ -0,0 +1,47 @@
+"""Export jobs for asynchronously built, cached export artifacts
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:30:00
+
+The API still runs create_all on startup, which may already have created the table.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table('export_jobs'):
+        return
+
+    op.create_table(
+        'export_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('job_id', sa.Integer(), sa.ForeignKey('jobs.id')),
+        sa.Column('format', sa.String(), nullable=False),
+        sa.Column('columns', sa.String(), nullable=False),
+        sa.Column('status', sa.String()),
+        sa.Column('max_post_id', sa.Integer()),
+        sa.Column('post_count', sa.Integer()),
+        sa.Column('artifact_path', sa.String()),
+        sa.Column('size_bytes', sa.Integer()),
+        sa.Column('error', sa.Text()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime()),
+    )
+    op.create_index('ix_export_jobs_id', 'export_jobs', ['id'])
+    op.create_index('ix_export_jobs_artifact', 'export_jobs',
+                    ['job_id', 'format', 'columns', 'max_post_id', 'post_count'])
+
+
+def downgrade() -> None:
+    op.drop_table('export_jobs')
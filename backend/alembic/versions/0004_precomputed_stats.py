@@ -0,0 +1,75 @@
+"""Precomputed dashboard counters: user_stats and group_stats
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 13:00:00
+
+Both tables are backfilled from posts and jobs so /data/stats is correct straight after the
+upgrade. The API still runs create_all on startup, which may already have created them empty.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tables = set() if context.is_offline_mode() else set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'group_stats' not in tables:
+        op.create_table(
+            'group_stats',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('job_id', sa.Integer(), sa.ForeignKey('jobs.id')),
+            sa.Column('group_name', sa.String(), nullable=False),
+            sa.Column('post_count', sa.Integer()),
+            sa.Column('last_scraped_at', sa.DateTime()),
+            sa.UniqueConstraint('job_id', 'group_name', name='uq_group_stats_job_group'),
+        )
+        op.create_index('ix_group_stats_id', 'group_stats', ['id'])
+        op.create_index('ix_group_stats_job_id', 'group_stats', ['job_id'])
+
+    if 'user_stats' not in tables:
+        op.create_table(
+            'user_stats',
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+            sa.Column('total_jobs', sa.Integer()),
+            sa.Column('active_jobs', sa.Integer()),
+            sa.Column('total_posts', sa.Integer()),
+            sa.Column('last_scraped_at', sa.DateTime()),
+            sa.Column('reconciled_at', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+        )
+
+    # Job totals first, since the user totals are summed from them
+    op.execute("UPDATE jobs SET total_posts = (SELECT COUNT(*) FROM posts WHERE posts.job_id = jobs.id)")
+    op.execute("DELETE FROM group_stats")
+    op.execute(
+        "INSERT INTO group_stats (job_id, group_name, post_count, last_scraped_at) "
+        "SELECT job_id, COALESCE(group_name, ''), COUNT(*), MAX(scraped_at) FROM posts "
+        "WHERE job_id IS NOT NULL GROUP BY job_id, COALESCE(group_name, '')"
+    )
+    op.execute("DELETE FROM user_stats")
+    op.execute(
+        "INSERT INTO user_stats (user_id, total_jobs, active_jobs, total_posts, last_scraped_at, reconciled_at) "
+        "SELECT users.id, "
+        "(SELECT COUNT(*) FROM jobs WHERE jobs.user_id = users.id), "
+        "(SELECT COUNT(*) FROM jobs WHERE jobs.user_id = users.id AND jobs.status = 'running'), "
+        "(SELECT COALESCE(SUM(jobs.total_posts), 0) FROM jobs WHERE jobs.user_id = users.id), "
+        "(SELECT MAX(group_stats.last_scraped_at) FROM group_stats JOIN jobs ON group_stats.job_id = jobs.id "
+        "WHERE jobs.user_id = users.id), "
+        "CURRENT_TIMESTAMP "
+        "FROM users"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
+    op.drop_table('group_stats')
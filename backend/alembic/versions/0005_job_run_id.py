@@ -0,0 +1,33 @@
+"""Per-run token on jobs, keying each run's Redis stop flag
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 15:00:00
+
+Existing jobs start without a token; their next start or scheduled dispatch assigns one.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = set() if context.is_offline_mode() else {
+        column['name'] for column in sa.inspect(op.get_bind()).get_columns('jobs')
+    }
+    if 'run_id' not in columns:
+        with op.batch_alter_table('jobs') as batch:
+            batch.add_column(sa.Column('run_id', sa.String()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('jobs') as batch:
+        batch.drop_column('run_id')
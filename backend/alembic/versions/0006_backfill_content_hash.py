@@ -0,0 +1,58 @@
+"""Backfill posts.content_hash for rows stored before the column existed
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 15:30:00
+
+Posts scraped before story ids became post_id are keyed by an author/content MD5, so a later run
+only recognises them by their content fingerprint. The fingerprint is computed in Python, so
+offline (--sql) runs skip the backfill; running the upgrade online afterwards fills it in.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.extractor import content_fingerprint
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+posts = sa.table(
+    'posts',
+    sa.column('id', sa.Integer()),
+    sa.column('content', sa.Text()),
+    sa.column('content_hash', sa.String()),
+)
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        return
+
+    bind = op.get_bind()
+    update = posts.update().where(posts.c.id == sa.bindparam('post_pk')).values(content_hash=sa.bindparam('hash'))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(posts.c.id, posts.c.content)
+            .where(posts.c.content_hash.is_(None), posts.c.id > last_id)
+            .order_by(posts.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        # Empty content gets '' rather than NULL, so it is not picked up again
+        bind.execute(update, [{'post_pk': row.id, 'hash': content_fingerprint(row.content or '')} for row in rows])
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    # The fingerprints stay valid for the older schema, which already has the column
+    pass
@@ -1,15 +1,20 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from datetime import datetime
-import pandas as pd
-import json
-import io
 from ..database import get_db
 from ..auth import get_current_user
-from ..models import User, Job, Post
+from ..models import User, Job, Post, SelectorStat, ExportJob
+from ..pagination import paginate_posts
+from ..selector_stats import group_scope
+from ..export import export_chunks, parse_columns, EXPORT_WRITERS, EXPORT_MEDIA_TYPES
+from ..artifacts import (
+    post_set_version, find_reusable_export, artifact_available, artifact_filename, artifact_media_type
+)
+from ..tasks import build_export
+from ..stats import load_user_stats
 
 router = APIRouter(prefix="/data", tags=["data"])
 
@@ -25,26 +30,76 @@ class PostResponse(BaseModel):
     shares: int
     scraped_at: datetime
 
-@router.get("/jobs/{job_id}/posts", response_model=List[PostResponse])
+class PostPage(BaseModel):
+    posts: List[PostResponse]
+    next_cursor: Optional[str]  # Pass back as ?cursor= for the next page; None on the last page
+
+class ExportCreate(BaseModel):
+    format: str = "csv"
+    columns: Optional[List[str]] = None  # Subset of columns in output order; all columns if omitted
+
+class ExportJobResponse(BaseModel):
+    id: int
+    job_id: int
+    format: str
+    columns: str
+    status: str
+    post_count: Optional[int]
+    size_bytes: Optional[int]
+    error: Optional[str]
+    created_at: datetime
+    completed_at: Optional[datetime]
+
+class SelectorStatResponse(BaseModel):
+    scope: str
+    kind: str
+    selector: str
+    hits: int
+    misses: int
+    score: float
+    last_hit: Optional[datetime]
+
+@router.get("/jobs/{job_id}/posts", response_model=PostPage)
 def get_job_posts(
     job_id: int, 
     current_user: User = Depends(get_current_user), 
     db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, le=1000)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    group_name: Optional[str] = None,
+    author: Optional[str] = None,
+    scraped_from: Optional[datetime] = None,
+    scraped_to: Optional[datetime] = None
 ):
     # Verify job ownership
     job = db.query(Job).filter(Job.id == job_id, Job.user_id == current_user.id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    posts = db.query(Post).filter(Post.job_id == job_id).offset(skip).limit(limit).all()
-    return posts
+    # Each filter is an equality or range on a column of one of the posts composite indexes
+    query = db.query(Post).filter(Post.job_id == job_id)
+    if group_name:
+        query = query.filter(Post.group_name == group_name)
+    if author:
+        query = query.filter(Post.author_name == author)
+    if scraped_from:
+        query = query.filter(Post.scraped_at >= scraped_from)
+    if scraped_to:
+        query = query.filter(Post.scraped_at < scraped_to)
+    
+    try:
+        posts, next_cursor = paginate_posts(query, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    return {"posts": posts, "next_cursor": next_cursor}
 
 @router.get("/jobs/{job_id}/export/{format}")
 def export_job_data(
     job_id: int, 
     format: str,
+    gzip: bool = False,
+    columns: Optional[str] = Query(None, description="Comma-separated subset of columns to export"),
     current_user: User = Depends(get_current_user), 
     db: Session = Depends(get_db)
 ):
@@ -53,64 +108,125 @@ def export_job_data(
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Get all posts for the job
-    posts = db.query(Post).filter(Post.job_id == job_id).all()
+    format = format.lower()
+    if format not in EXPORT_WRITERS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Use one of: {', '.join(EXPORT_WRITERS)}")
+    
+    try:
+        selected_columns = parse_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    if not posts:
+    if not db.query(Post.id).filter(Post.job_id == job_id).first():
         raise HTTPException(status_code=404, detail="No data found for this job")
     
-    # Convert to DataFrame
-    posts_data = []
-    for post in posts:
-        posts_data.append({
-            'post_id': post.post_id,
-            'group_name': post.group_name,
-            'author_name': post.author_name,
-            'author_url': post.author_url,
-            'content': post.content,
-            'timestamp': post.timestamp,
-            'likes': post.likes,
-            'comments': post.comments,
-            'shares': post.shares,
-            'post_url': post.post_url,
-            'scraped_at': post.scraped_at
-        })
-    
-    df = pd.DataFrame(posts_data)
-    
-    if format.lower() == 'csv':
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        output.seek(0)
-        
-        return StreamingResponse(
-            io.BytesIO(output.getvalue().encode()),
-            media_type='text/csv',
-            headers={"Content-Disposition": f"attachment; filename=job_{job_id}_data.csv"}
-        )
-    
-    elif format.lower() == 'json':
-        output = df.to_json(orient='records', date_format='iso')
-        
-        return StreamingResponse(
-            io.BytesIO(output.encode()),
-            media_type='application/json',
-            headers={"Content-Disposition": f"attachment; filename=job_{job_id}_data.json"}
-        )
-    
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported format. Use 'csv' or 'json'")
+    # Rows are read in batches and written to the client as they are encoded
+    filename = f"job_{job_id}_data.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export_chunks(job_id, format, selected_columns, compress=gzip),
+        media_type='application/gzip' if gzip else EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.post("/jobs/{job_id}/exports", response_model=ExportJobResponse)
+def create_export(
+    job_id: int,
+    export_request: ExportCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Verify job ownership
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == current_user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    format = export_request.format.lower()
+    if format not in EXPORT_WRITERS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Use one of: {', '.join(EXPORT_WRITERS)}")
+    
+    try:
+        selected_columns = parse_columns(','.join(export_request.columns or []))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    max_post_id, post_count = post_set_version(db, job_id)
+    if not post_count:
+        raise HTTPException(status_code=404, detail="No data found for this job")
+    
+    # Unchanged posts since an earlier export of the same shape: hand back that export instead of rebuilding it
+    export = find_reusable_export(db, job_id, format, selected_columns, max_post_id, post_count)
+    if export:
+        return export
+    
+    export = ExportJob(
+        job_id=job_id,
+        format=format,
+        columns=','.join(selected_columns),
+        status="pending",
+        max_post_id=max_post_id,
+        post_count=post_count,
+        created_at=datetime.now()
+    )
+    db.add(export)
+    db.commit()
+    db.refresh(export)
+    
+    try:
+        build_export.delay(export.id)
+    except Exception as e:
+        export.status = "failed"
+        export.error = f"Could not queue export: {str(e)}"
+        db.commit()
+        raise HTTPException(status_code=503, detail="Export queue unavailable")
+    
+    return export
+
+def get_owned_export(export_id: int, current_user: User, db: Session) -> ExportJob:
+    export = db.query(ExportJob).join(Job).filter(
+        ExportJob.id == export_id, Job.user_id == current_user.id
+    ).first()
+    if not export:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return export
+
+@router.get("/exports/{export_id}", response_model=ExportJobResponse)
+def get_export(export_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    return get_owned_export(export_id, current_user, db)
+
+@router.get("/exports/{export_id}/download")
+def download_export(export_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    export = get_owned_export(export_id, current_user, db)
+    if export.status in ("pending", "running"):
+        raise HTTPException(status_code=409, detail=f"Export is still {export.status}")
+    if export.status == "failed":
+        raise HTTPException(status_code=409, detail=f"Export failed: {export.error}")
+    if not artifact_available(export):
+        raise HTTPException(status_code=410, detail="Export is no longer available; request a new one")
+    
+    return FileResponse(
+        export.artifact_path,
+        media_type=artifact_media_type(export),
+        filename=artifact_filename(export)
+    )
 
 @router.get("/stats")
 def get_user_stats(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    total_jobs = db.query(Job).filter(Job.user_id == current_user.id).count()
-    total_posts = db.query(Post).join(Job).filter(Job.user_id == current_user.id).count()
-    active_jobs = db.query(Job).filter(Job.user_id == current_user.id, Job.status == "running").count()
-    
-    return {
-        "total_jobs": total_jobs,
-        "total_posts": total_posts,
-        "active_jobs": active_jobs,
-        "user_tier": current_user.user_tier
-    }
+    # Counters kept by the post writer and job status changes; the dashboard polls this on every rerun
+    return load_user_stats(db, current_user)
+
 
+@router.get("/selector-stats", response_model=List[SelectorStatResponse])
+def get_selector_stats(
+    scope: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # Scopes name the groups scraped, so users only see the groups of their own jobs
+    group_urls = db.query(Job.group_urls).filter(Job.user_id == current_user.id).all()
+    scopes = {group_scope(url) for (urls,) in group_urls for url in (urls or [])}
+    if scope:
+        scopes &= {scope}
+    
+    # A falling score on a previously reliable selector means the markup changed
+    query = db.query(SelectorStat).filter(SelectorStat.scope.in_(scopes))
+    return query.order_by(SelectorStat.scope, SelectorStat.kind, SelectorStat.score.desc()).all()
@@ -7,6 +7,10 @@ from ..database import get_db
 from ..auth import get_current_user
 from ..models import User, Job, JobLog
 from ..tasks import scrape_facebook_group
+from ..scheduler import validate_schedule, refresh_schedule, ACTIVE_STATUSES
+from ..control import request_stop, new_run_id
+from ..artifacts import delete_job_exports
+from ..stats import set_job_status, job_created, job_deleted
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
@@ -25,6 +29,11 @@ class JobResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     last_run: Optional[datetime]
+    next_run_at: Optional[datetime] = None
+
+class JobScheduleUpdate(BaseModel):
+    cron: Optional[str] = None
+    interval_minutes: Optional[float] = None
 
 class JobLogResponse(BaseModel):
     id: int
@@ -48,6 +57,13 @@ def create_job(job: JobCreate, current_user: User = Depends(get_current_user), d
         if len(job.group_urls) > 3:
             raise HTTPException(status_code=400, detail="Free users limited to 3 groups per job")
     
+    schedule = (job.config or {}).get('schedule')
+    if schedule:
+        try:
+            validate_schedule(schedule)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid schedule: {str(e)}")
+    
     db_job = Job(
         user_id=current_user.id,
         name=job.name,
@@ -55,9 +71,16 @@ def create_job(job: JobCreate, current_user: User = Depends(get_current_user), d
         config=job.config
     )
     db.add(db_job)
+    job_created(db, db_job)
     db.commit()
     db.refresh(db_job)
     
+    # The start offset within the spread window depends on the job id
+    if schedule:
+        refresh_schedule(db_job)
+        db.commit()
+        db.refresh(db_job)
+    
     return db_job
 
 @router.get("/{job_id}", response_model=JobResponse)
@@ -73,16 +96,49 @@ def start_job(job_id: int, current_user: User = Depends(get_current_user), db: S
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    if job.status == "running":
+    if job.status == "stopping":
+        raise HTTPException(status_code=400, detail="Job is still stopping; start it again once it is paused")
+    if job.status in ACTIVE_STATUSES:
         raise HTTPException(status_code=400, detail="Job is already running")
     
+    resuming = bool(job.checkpoint)
+    
+    # A new run gets its own stop flag; committed first so the worker cannot race the status
+    job.run_id = new_run_id()
+    set_job_status(db, job, "queued")
+    db.commit()
+    
     # Start the scraping task
     scrape_facebook_group.delay(job_id)
     
-    job.status = "running"
+    return {"message": "Job resumed successfully" if resuming else "Job started successfully"}
+
+@router.put("/{job_id}/schedule", response_model=JobResponse)
+def update_job_schedule(job_id: int, schedule: JobScheduleUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == current_user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    job_config = dict(job.config or {})
+    new_schedule = {
+        key: value for key, value in (('cron', schedule.cron), ('interval_minutes', schedule.interval_minutes)) if value
+    }
+    if new_schedule:
+        try:
+            validate_schedule(new_schedule)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid schedule: {str(e)}")
+        job_config['schedule'] = new_schedule
+    else:
+        # An empty body turns the schedule off
+        job_config.pop('schedule', None)
+    
+    job.config = job_config
+    refresh_schedule(job)
     db.commit()
+    db.refresh(job)
     
-    return {"message": "Job started successfully"}
+    return job
 
 @router.post("/{job_id}/stop")
 def stop_job(job_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -90,7 +146,13 @@ def stop_job(job_id: int, current_user: User = Depends(get_current_user), db: Se
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job.status = "paused"
+    # The running scraper sees the flag at its next scroll, saves its checkpoint, releases the browser
+    # and moves the job from stopping to paused; until then the job cannot be started again
+    if job.status in ACTIVE_STATUSES:
+        request_stop(job_id, job.run_id)
+        set_job_status(db, job, "stopping")
+    else:
+        set_job_status(db, job, "paused")
     db.commit()
     
     return {"message": "Job stopped successfully"}
@@ -101,6 +163,9 @@ def delete_job(job_id: int, current_user: User = Depends(get_current_user), db:
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    request_stop(job_id, job.run_id, reason="deleted")
+    delete_job_exports(db, job_id)
+    job_deleted(db, job)
     db.delete(job)
     db.commit()
     
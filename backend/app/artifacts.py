@@ -0,0 +1,133 @@
+import os
+import logging
+import tempfile
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from decouple import config
+from .models import ExportJob, Post
+from .export import export_chunks, EXPORT_MEDIA_TYPES
+
+logger = logging.getLogger(__name__)
+
+# Local directory for finished exports; the API and the export workers must both see it
+EXPORT_ARTIFACT_DIR = config('EXPORT_ARTIFACT_DIR', default='./exports')
+
+# An export still pending or running after this long is assumed lost and is not reused
+EXPORT_TIME_LIMIT = config('EXPORT_TIME_LIMIT', default=3600, cast=int)
+
+# Parquet compresses its pages with zstd already; every other format is gzipped on disk
+PRECOMPRESSED_FORMATS = ('parquet',)
+
+IN_PROGRESS_STATUSES = ('pending', 'running')
+
+def post_set_version(db: Session, job_id: int) -> Tuple[Optional[int], int]:
+    """The job's newest post id and post count, which change whenever posts are added or removed"""
+    max_post_id, post_count = db.query(func.max(Post.id), func.count(Post.id)).filter(Post.job_id == job_id).one()
+    return max_post_id, post_count or 0
+
+def is_compressed(format: str) -> bool:
+    return format not in PRECOMPRESSED_FORMATS
+
+def artifact_filename(export: ExportJob) -> str:
+    return f"job_{export.job_id}_data.{export.format}" + (".gz" if is_compressed(export.format) else "")
+
+def artifact_media_type(export: ExportJob) -> str:
+    return 'application/gzip' if is_compressed(export.format) else EXPORT_MEDIA_TYPES[export.format]
+
+def artifact_available(export: ExportJob) -> bool:
+    return export.status == 'completed' and bool(export.artifact_path) and os.path.exists(export.artifact_path)
+
+def find_reusable_export(db: Session, job_id: int, format: str, columns: List[str],
+                         max_post_id: int, post_count: int) -> Optional[ExportJob]:
+    """A finished or in-flight export of exactly this post set with the same options"""
+    candidates = db.query(ExportJob).filter(
+        ExportJob.job_id == job_id,
+        ExportJob.format == format,
+        ExportJob.columns == ','.join(columns),
+        ExportJob.max_post_id == max_post_id,
+        ExportJob.post_count == post_count,
+        ExportJob.status.in_(('completed',) + IN_PROGRESS_STATUSES)
+    ).order_by(ExportJob.id.desc()).all()
+
+    stale_before = datetime.now() - timedelta(seconds=EXPORT_TIME_LIMIT)
+    for export in candidates:
+        if artifact_available(export):
+            return export
+        if export.status in IN_PROGRESS_STATUSES and export.created_at and export.created_at > stale_before:
+            return export
+    return None
+
+def _remove_file(path: Optional[str]):
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove export artifact {path}: {str(e)}")
+
+def prune_superseded_exports(db: Session, export: ExportJob):
+    """Delete the files of older exports with the same options, whose post sets are out of date"""
+    superseded = db.query(ExportJob).filter(
+        ExportJob.job_id == export.job_id,
+        ExportJob.format == export.format,
+        ExportJob.columns == export.columns,
+        ExportJob.status == 'completed',
+        ExportJob.id != export.id,
+        ExportJob.max_post_id <= export.max_post_id
+    ).all()
+    for old in superseded:
+        if (old.max_post_id, old.post_count) == (export.max_post_id, export.post_count):
+            continue
+        _remove_file(old.artifact_path)
+        old.status = 'expired'
+        old.artifact_path = None
+    db.commit()
+
+def delete_job_exports(db: Session, job_id: int):
+    """Remove a job's export records and their files; the caller commits"""
+    for export in db.query(ExportJob).filter(ExportJob.job_id == job_id).all():
+        _remove_file(export.artifact_path)
+        db.delete(export)
+
+def build_export_artifact(db: Session, export_id: int) -> Optional[ExportJob]:
+    """Write an export into the artifact store; the file only appears under its final name once complete"""
+    export = db.query(ExportJob).filter(ExportJob.id == export_id).first()
+    if not export or artifact_available(export):
+        return export
+
+    export.status = 'running'
+    export.error = None
+    db.commit()
+
+    os.makedirs(EXPORT_ARTIFACT_DIR, exist_ok=True)
+    path = os.path.join(EXPORT_ARTIFACT_DIR, f"export_{export.id}_{artifact_filename(export)}")
+    fd, partial_path = tempfile.mkstemp(dir=EXPORT_ARTIFACT_DIR, prefix=f".export_{export.id}_", suffix=".part")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            chunks = export_chunks(export.job_id, export.format, export.columns.split(','),
+                                   compress=is_compressed(export.format), max_post_id=export.max_post_id)
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(partial_path, path)
+    except Exception as e:
+        _remove_file(partial_path)
+        logger.error(f"Export {export_id} of job {export.job_id} failed: {str(e)}")
+        db.rollback()
+        export.status = 'failed'
+        export.error = str(e)
+        export.completed_at = datetime.now()
+        db.commit()
+        return export
+
+    export.status = 'completed'
+    export.artifact_path = path
+    export.size_bytes = os.path.getsize(path)
+    export.completed_at = datetime.now()
+    db.commit()
+
+    prune_superseded_exports(db, export)
+    return export
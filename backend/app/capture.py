@@ -0,0 +1,147 @@
+import json
+import base64
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from selenium.common.exceptions import WebDriverException
+from .extractor import content_fingerprint, parse_permalink, canonical_post_url, PARSE_ERRORS
+
+logger = logging.getLogger(__name__)
+
+GRAPHQL_URL_MARKER = '/api/graphql'
+
+# Some endpoints prefix JSON with an anti-hijacking guard
+JSON_GUARD = 'for (;;);'
+
+def iter_json_documents(text: str) -> Iterator[Any]:
+    """Yield every JSON document in a response body; streamed responses hold one per line"""
+    if text.startswith(JSON_GUARD):
+        text = text[len(JSON_GUARD):]
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+def iter_stories(node: Any) -> Iterator[Dict]:
+    """Walk a payload and yield top-level Story objects (shared stories stay inside their parent)"""
+    if isinstance(node, dict):
+        if node.get('__typename') == 'Story' and node.get('post_id'):
+            yield node
+            return
+        for value in node.values():
+            yield from iter_stories(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from iter_stories(item)
+
+def find_key(node: Any, key: str) -> Any:
+    """Depth-first search for the first value stored under key"""
+    if isinstance(node, dict):
+        if key in node:
+            return node[key]
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return None
+
+    for child in children:
+        found = find_key(child, key)
+        if found is not None:
+            return found
+    return None
+
+def _count(value: Any) -> int:
+    if isinstance(value, dict):
+        value = value.get('count', value.get('total_count'))
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+def story_to_post(story: Dict, group_name: str, group_url: str) -> Dict:
+    """Map a GraphQL Story onto the scraper's post dict schema"""
+    actors = find_key(story, 'actors') or [{}]
+    actor = actors[0] if isinstance(actors, list) and actors else {}
+    message = find_key(story, 'message')
+    content = message.get('text', '') if isinstance(message, dict) else ''
+    creation_time = find_key(story, 'creation_time')
+
+    post_data = {
+        'group_name': group_name,
+        'author_name': actor.get('name') or '',
+        'author_url': actor.get('url') or '',
+        'content': content.strip(),
+        'timestamp': datetime.fromtimestamp(creation_time) if creation_time else datetime.now(),
+        'likes': _count(find_key(story, 'reaction_count')),
+        'comments': _count(find_key(story, 'total_comment_count') or find_key(story, 'comment_count')),
+        'shares': _count(find_key(story, 'share_count')),
+        'post_url': '',
+        'post_id': str(story['post_id']),
+        'content_hash': '',
+        'media_urls': []
+    }
+
+    # Same canonical key and URL the DOM extractor derives from the permalink anchor
+    _, group_id = parse_permalink(story.get('url') or find_key(story, 'permalink_url') or '')
+    if group_id is None:
+        _, group_id = parse_permalink(f"{group_url.rstrip('/')}/posts/{post_data['post_id']}")
+    post_data['post_url'] = canonical_post_url(post_data['post_id'], group_id)
+    post_data['content_hash'] = content_fingerprint(post_data['content'])
+    return post_data
+
+def parse_feed_payload(text: str, group_name: str, group_url: str) -> List[Dict]:
+    """Parse every feed post out of one GraphQL response body"""
+    posts = []
+    for document in iter_json_documents(text):
+        for story in iter_stories(document):
+            try:
+                posts.append(story_to_post(story, group_name, group_url))
+            except PARSE_ERRORS as e:
+                logger.debug(f"Could not parse story: {str(e)}")
+    return posts
+
+class GraphQLCapture:
+    """Collects the feed's GraphQL responses from DevTools network events"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pending = set()
+
+    def response_body(self, request_id: str) -> Optional[str]:
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException as e:
+            logger.debug(f"Response body for {request_id} unavailable: {str(e)}")
+            return None
+
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        return body
+
+    def extract_posts(self, events: List[Dict], group_name: str, group_url: str) -> List[Dict]:
+        """Turn finished GraphQL responses among the given events into post dicts"""
+        posts = []
+        for event in events:
+            method = event.get('method')
+            params = event.get('params', {})
+            request_id = params.get('requestId')
+
+            if method == 'Network.responseReceived':
+                if GRAPHQL_URL_MARKER in params.get('response', {}).get('url', ''):
+                    self.pending.add(request_id)
+            elif method == 'Network.loadingFinished' and request_id in self.pending:
+                # Bodies are only complete once loading has finished
+                self.pending.discard(request_id)
+                body = self.response_body(request_id)
+                if body:
+                    posts.extend(parse_feed_payload(body, group_name, group_url))
+            elif method == 'Network.loadingFailed':
+                self.pending.discard(request_id)
+
+        return posts
@@ -0,0 +1,48 @@
+import os
+import logging
+import threading
+import uuid
+from typing import Optional
+import redis
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+
+# Stop flags outlive any realistic run but do not accumulate forever
+STOP_FLAG_TTL = config('JOB_STOP_FLAG_TTL', default=86400, cast=int)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_redis() -> redis.Redis:
+    """Redis client for this process; clients are not shared across forked workers"""
+    pid = os.getpid()
+    with _clients_lock:
+        if pid not in _clients:
+            _clients[pid] = redis.Redis.from_url(REDIS_URL, socket_timeout=5, decode_responses=True)
+        return _clients[pid]
+
+def new_run_id() -> str:
+    """Token for one run of a job; stop flags are keyed by it so runs cannot clear each other's"""
+    return uuid.uuid4().hex
+
+def stop_key(job_id: int, run_id: Optional[str]) -> str:
+    return f"job:{job_id}:{run_id}:stop"
+
+def request_stop(job_id: int, run_id: Optional[str], reason: str = "paused"):
+    """Ask a run of a job to stop at its next scroll; the flag expires on its own"""
+    try:
+        get_redis().set(stop_key(job_id, run_id), reason, ex=STOP_FLAG_TTL)
+    except redis.RedisError as e:
+        # The scraper also re-reads the job status, so the stop still lands, only later
+        logger.warning(f"Could not set stop flag for job {job_id}: {str(e)}")
+
+def stop_requested(job_id: int, run_id: Optional[str]) -> Optional[str]:
+    """The reason a stop was requested, or None while the run should keep going"""
+    try:
+        return get_redis().get(stop_key(job_id, run_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not read stop flag for job {job_id}: {str(e)}")
+        return None
@@ -0,0 +1,31 @@
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from .models import GroupCursor
+
+logger = logging.getLogger(__name__)
+
+# Consecutive already-known posts after which an incremental scrape stops scrolling
+INCREMENTAL_STOP_AFTER = 5
+
+def load_group_cursor(db: Session, job_id: int, group_url: str) -> Optional[GroupCursor]:
+    return db.query(GroupCursor).filter(GroupCursor.job_id == job_id, GroupCursor.group_url == group_url).first()
+
+def save_group_cursor(db: Session, job_id: int, group_url: str, newest_post: Optional[Dict]):
+    """Record the newest post seen in a group and when the group was last scraped"""
+    try:
+        cursor = load_group_cursor(db, job_id, group_url)
+        if cursor is None:
+            cursor = GroupCursor(job_id=job_id, group_url=group_url)
+            db.add(cursor)
+
+        if newest_post is not None:
+            cursor.newest_post_id = newest_post['post_id']
+            cursor.newest_post_timestamp = newest_post.get('timestamp')
+        cursor.last_scraped_at = datetime.now()
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.warning(f"Could not save cursor for {group_url}: {str(e)}")
@@ -0,0 +1,79 @@
+import logging
+import threading
+from typing import Iterable, Optional, Set
+from sqlalchemy.orm import Session
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Keeps each IN (...) list under SQLite's bound-parameter limit
+DEFAULT_CHUNK_SIZE = 500
+
+class KnownPosts:
+    """post_ids and content fingerprints a job has stored, loaded once and shared by its group threads"""
+
+    def __init__(self):
+        self.post_ids: Set[str] = set()
+        # The same post stored under another key, e.g. the author/content MD5 used before story ids
+        self.content_hashes: Set[str] = set()
+        self.lock = threading.Lock()
+
+    def load(self, db: Session, job_id: int):
+        """Preload everything this job has already stored with a single query"""
+        with self.lock:
+            for post_id, content_hash in db.query(Post.post_id, Post.content_hash).filter(Post.job_id == job_id):
+                self.post_ids.add(post_id)
+                if content_hash:
+                    self.content_hashes.add(content_hash)
+        logger.info(f"Loaded {len(self.post_ids)} known post ids for job {job_id}")
+
+class PostDeduplicator:
+    """In-memory post index that batches existence checks against the database"""
+
+    def __init__(self, db: Session, job_id: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 known: Optional[KnownPosts] = None):
+        self.db = db
+        self.chunk_size = chunk_size
+        # A parallel job's group threads each query through their own session but share one index
+        self.index = known or KnownPosts()
+        if known is None and job_id is not None:
+            self.index.load(db, job_id)
+
+    def __contains__(self, post_id: str) -> bool:
+        with self.index.lock:
+            return post_id in self.index.post_ids
+
+    def __len__(self) -> int:
+        return len(self.index.post_ids)
+
+    def claim(self, post_id: str, content_hash: Optional[str] = None) -> bool:
+        """Mark a post as taken; False if its id or content was already known, so only one thread yields it"""
+        with self.index.lock:
+            if post_id in self.index.post_ids or (content_hash and content_hash in self.index.content_hashes):
+                return False
+            self.index.post_ids.add(post_id)
+            if content_hash:
+                self.index.content_hashes.add(content_hash)
+            return True
+
+    def existing(self, post_ids: Iterable[str]) -> Set[str]:
+        """Return the given post_ids that are already stored, one IN query per chunk"""
+        pending = list({post_id for post_id in post_ids if post_id})
+        found = set()
+
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start:start + self.chunk_size]
+            rows = self.db.query(Post.post_id).filter(Post.post_id.in_(chunk)).all()
+            found.update(row[0] for row in rows)
+
+        with self.index.lock:
+            self.index.post_ids.update(found)
+        return found
+
+    def filter_new(self, post_ids: Iterable[str]) -> Set[str]:
+        """Return the post_ids that are neither known in memory nor stored"""
+        with self.index.lock:
+            candidates = {post_id for post_id in post_ids if post_id and post_id not in self.index.post_ids}
+        if not candidates:
+            return set()
+        return candidates - self.existing(candidates)
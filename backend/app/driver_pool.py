@@ -0,0 +1,224 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import (
+    WebDriverException, InvalidSessionIdException, SessionNotCreatedException, NoSuchWindowException
+)
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+import undetected_chromedriver as uc
+from selenium_stealth import stealth
+from fake_useragent import UserAgent
+from decouple import config
+from .network import BLOCK_IMAGES
+
+logger = logging.getLogger(__name__)
+
+# Warm browsers kept per worker process
+DRIVER_POOL_SIZE = config('DRIVER_POOL_SIZE', default=2, cast=int)
+# Jobs a browser serves before it is quit and replaced
+DRIVER_MAX_USES = config('DRIVER_MAX_USES', default=20, cast=int)
+# Seconds to wait for a free browser when the pool is exhausted
+DRIVER_CHECKOUT_TIMEOUT = config('DRIVER_CHECKOUT_TIMEOUT', default=300.0, cast=float)
+# How often a checkout waiting without a deadline re-checks whether it should give up
+CHECKOUT_POLL_INTERVAL = 5.0
+# Run Chrome without a display (new headless mode)
+HEADLESS = config('HEADLESS', default=False, cast=bool)
+
+# Errors after which the same job may well succeed on a fresh browser
+TRANSIENT_DRIVER_EXCEPTIONS = (
+    InvalidSessionIdException, SessionNotCreatedException, NoSuchWindowException,
+    ConnectionError, TimeoutError, Urllib3HTTPError
+)
+TRANSIENT_DRIVER_MESSAGES = ('chrome not reachable', 'disconnected', 'session deleted', 'target window already closed')
+
+class TransientDriverError(Exception):
+    """The browser crashed or became unreachable; the job can be retried on another driver"""
+
+def is_transient_driver_error(error: Exception) -> bool:
+    if isinstance(error, (TransientDriverError,) + TRANSIENT_DRIVER_EXCEPTIONS):
+        return True
+    message = str(error).lower()
+    return isinstance(error, WebDriverException) and any(text in message for text in TRANSIENT_DRIVER_MESSAGES)
+
+def create_driver(user_agent: str):
+    """Launch a Chrome instance with the stealth configuration"""
+    # Chrome options for stealth mode
+    options = Options()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument(f'--user-agent={user_agent}')
+    
+    # Media is never extracted, so don't download or decode it
+    if BLOCK_IMAGES:
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    
+    # DevTools network events are read back through the performance log
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    # Use undetected-chromedriver
+    driver = uc.Chrome(options=options, version_main=None, headless=HEADLESS)
+
+    # Apply selenium-stealth
+    stealth(driver,
+        languages=["en-US", "en"],
+        vendor="Google Inc.",
+        platform="Win32",
+        webgl_vendor="Intel Inc.",
+        renderer="Intel Iris OpenGL Engine",
+        fix_hairline=True,
+    )
+
+    # Additional stealth measures
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+    return driver
+
+class DriverPool:
+    """Per-process pool of warm Chrome drivers that are recycled between jobs"""
+
+    def __init__(self, max_size: int = DRIVER_POOL_SIZE, max_uses: int = DRIVER_MAX_USES):
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.user_agent = UserAgent()
+        self.idle: List = []
+        self.uses: Dict[int, int] = {}
+        self.total = 0
+        self.condition = threading.Condition()
+
+    def checkout(self, timeout: Optional[float] = DRIVER_CHECKOUT_TIMEOUT,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        """Return a clean, healthy driver, launching one if the pool has room.
+
+        With no timeout it waits until a driver frees up, returning None if should_stop() turns true first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # The lock only guards the bookkeeping; browser round trips happen outside it
+            with self.condition:
+                while not self.idle and self.total >= self.max_size:
+                    if should_stop and should_stop():
+                        return None
+                    if deadline is None:
+                        self.condition.wait(CHECKOUT_POLL_INTERVAL)
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self.condition.wait(remaining):
+                        raise TimeoutError(f"No browser driver available after {timeout}s")
+
+                if self.idle:
+                    driver = self.idle.pop()
+                else:
+                    # Reserve the slot before launching outside the lock
+                    self.total += 1
+                    driver = None
+
+            if driver is None:
+                return self._launch()
+
+            if self._is_healthy(driver):
+                self._reset(driver)
+                with self.condition:
+                    self.uses[id(driver)] += 1
+                return driver
+
+            self._discard(driver)
+
+    def checkin(self, driver, healthy: bool = True):
+        """Give a driver back, quitting it if it is broken or worn out"""
+        if driver is None:
+            return
+
+        if healthy and self.uses.get(id(driver), 0) < self.max_uses and self._clean(driver):
+            with self.condition:
+                self.idle.append(driver)
+                self.condition.notify()
+        else:
+            self._discard(driver)
+
+    def close(self):
+        """Quit every idle driver"""
+        with self.condition:
+            idle, self.idle = self.idle, []
+        for driver in idle:
+            self._discard(driver)
+
+    def _launch(self):
+        try:
+            driver = create_driver(self.user_agent.random)
+        except Exception:
+            with self.condition:
+                self.total -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.uses[id(driver)] = 1
+        logger.info(f"Launched pooled driver ({self.total}/{self.max_size})")
+        return driver
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _clean(self, driver) -> bool:
+        """Drop cookies, storage and cache left behind by the previous job"""
+        try:
+            driver.delete_all_cookies()
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+                'origin': 'https://www.facebook.com',
+                'storageTypes': 'all'
+            })
+            driver.get('about:blank')
+            # Drop network events so the next job starts with an empty performance log
+            driver.get_log('performance')
+            return True
+        except Exception as e:
+            logger.warning(f"Could not clean pooled driver: {str(e)}")
+            return False
+
+    def _reset(self, driver):
+        """Give a reused driver a fresh user agent"""
+        try:
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': self.user_agent.random})
+        except Exception as e:
+            logger.warning(f"Could not reset user agent: {str(e)}")
+
+    def _discard(self, driver):
+        """Free the driver's slot, then quit it without holding the lock"""
+        with self.condition:
+            self.uses.pop(id(driver), None)
+            self.total -= 1
+            self.condition.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_driver_pool() -> DriverPool:
+    """Return this worker process's pool, creating it after fork"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = DriverPool()
+            _pool_pid = os.getpid()
+        return _pool
+
+def close_driver_pool():
+    """Quit this process's pooled drivers"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.close()
+        _pool = None
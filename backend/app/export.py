@@ -0,0 +1,196 @@
+import io
+import csv
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from decouple import config
+from .database import SessionLocal
+from .models import Post
+
+# Rows fetched per round trip and written per response chunk
+EXPORT_BATCH_SIZE = config('EXPORT_BATCH_SIZE', default=1000, cast=int)
+
+# Rows per Parquet row group / Arrow record batch
+COLUMNAR_BATCH_SIZE = config('EXPORT_COLUMNAR_BATCH_SIZE', default=10000, cast=int)
+
+EXPORT_COLUMNS = [
+    'post_id', 'group_name', 'author_name', 'author_url', 'content', 'timestamp',
+    'likes', 'comments', 'shares', 'post_url', 'scraped_at'
+]
+
+# Typed columns for the columnar formats; repeated names are dictionary-encoded
+ARROW_SCHEMA = pa.schema([
+    ('post_id', pa.string()),
+    ('group_name', pa.dictionary(pa.int32(), pa.string())),
+    ('author_name', pa.dictionary(pa.int32(), pa.string())),
+    ('author_url', pa.string()),
+    ('content', pa.string()),
+    ('timestamp', pa.timestamp('us')),
+    ('likes', pa.int64()),
+    ('comments', pa.int64()),
+    ('shares', pa.int64()),
+    ('post_url', pa.string()),
+    ('scraped_at', pa.timestamp('us')),
+])
+
+DICTIONARY_COLUMNS = ['group_name', 'author_name']
+
+EXPORT_MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+def parse_columns(columns: Optional[str]) -> List[str]:
+    """Validate a comma-separated column projection, keeping the requested order"""
+    if not columns:
+        return list(EXPORT_COLUMNS)
+    selected = [column.strip() for column in columns.split(',') if column.strip()]
+    unknown = [column for column in selected if column not in EXPORT_COLUMNS]
+    if unknown or not selected:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}. Choose from {', '.join(EXPORT_COLUMNS)}")
+    return list(dict.fromkeys(selected))
+
+def iter_export_rows(job_id: int, columns: List[str], batch_size: int = EXPORT_BATCH_SIZE,
+                     max_post_id: Optional[int] = None) -> Iterator[Dict]:
+    """Yield a job's posts as plain dicts, holding only one batch in memory at a time"""
+    # The request's session may be closed before the response finishes streaming
+    db = SessionLocal()
+    try:
+        stmt = (
+            select(*(getattr(Post, column) for column in columns))
+            .where(Post.job_id == job_id)
+            .order_by(Post.id)
+            # Server-side cursor on PostgreSQL; batched fetches elsewhere
+            .execution_options(yield_per=batch_size)
+        )
+        if max_post_id is not None:
+            # Posts scraped after the export was requested are left out
+            stmt = stmt.where(Post.id <= max_post_id)
+        for row in db.execute(stmt):
+            yield dict(row._mapping)
+    finally:
+        db.close()
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _batched(rows: Iterable[Dict], batch_size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class ChunkBuffer(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def record_batches(rows: Iterable[Dict], columns: List[str], batch_size: int) -> Iterator[pa.RecordBatch]:
+    schema = pa.schema([ARROW_SCHEMA.field(column) for column in columns])
+    for batch in _batched(rows, batch_size):
+        yield pa.RecordBatch.from_pylist(batch, schema=schema)
+
+def parquet_chunks(rows: Iterable[Dict], columns: List[str], batch_size: int = COLUMNAR_BATCH_SIZE) -> Iterator[bytes]:
+    """One row group per batch; the footer is written once the last batch is in"""
+    sink = ChunkBuffer()
+    schema = pa.schema([ARROW_SCHEMA.field(column) for column in columns])
+    writer = pq.ParquetWriter(
+        sink, schema,
+        compression='zstd',
+        use_dictionary=[column for column in DICTIONARY_COLUMNS if column in columns] or False
+    )
+    for batch in record_batches(rows, columns, batch_size):
+        writer.write_table(pa.Table.from_batches([batch]))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+def arrow_chunks(rows: Iterable[Dict], columns: List[str], batch_size: int = COLUMNAR_BATCH_SIZE) -> Iterator[bytes]:
+    """Arrow IPC stream format, readable with pyarrow.ipc.open_stream"""
+    sink = ChunkBuffer()
+    writer = pa.ipc.new_stream(sink, pa.schema([ARROW_SCHEMA.field(column) for column in columns]))
+    for batch in record_batches(rows, columns, batch_size):
+        writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+def csv_chunks(rows: Iterable[Dict], columns: List[str], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    for batch in _batched(rows, batch_size):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header of an export with no rows
+        yield buffer.getvalue().encode()
+
+def ndjson_chunks(rows: Iterable[Dict], columns: List[str], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    for batch in _batched(rows, batch_size):
+        yield ''.join(json.dumps(row, default=_json_value) + '\n' for row in batch).encode()
+
+def json_array_chunks(rows: Iterable[Dict], columns: List[str], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    yield b'['
+    separator = ''
+    for batch in _batched(rows, batch_size):
+        yield (separator + ','.join(json.dumps(row, default=_json_value) for row in batch)).encode()
+        separator = ','
+    yield b']'
+
+EXPORT_WRITERS = {
+    'csv': csv_chunks,
+    'json': json_array_chunks,
+    'ndjson': ndjson_chunks,
+    'parquet': parquet_chunks,
+    'arrow': arrow_chunks,
+}
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a chunk stream into a single gzip member without buffering it"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def export_chunks(job_id: int, format: str, columns: Optional[List[str]] = None, compress: bool = False,
+                  max_post_id: Optional[int] = None) -> Iterator[bytes]:
+    """The full export body for a job in the given format"""
+    columns = columns or list(EXPORT_COLUMNS)
+    rows = iter_export_rows(job_id, columns, max_post_id=max_post_id)
+    chunks = EXPORT_WRITERS[format](rows, columns)
+    return gzip_chunks(chunks) if compress else chunks
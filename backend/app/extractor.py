@@ -0,0 +1,212 @@
+import re
+import hashlib
+import logging
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from bs4 import BeautifulSoup
+from .metrics import extract_metrics
+
+logger = logging.getLogger(__name__)
+
+# Feed post containers
+ARTICLE_SELECTOR = '[data-pagelet="FeedUnit_0"], [role="article"]'
+
+GROUP_NAME_SELECTORS = [
+    'h1[data-testid="group-name"]',
+    'h1',
+    '[data-testid="page-title"]'
+]
+
+AUTHOR_SELECTOR = 'a[role="link"]'
+
+CONTENT_SELECTORS = [
+    '[data-testid="post_message"]',
+    '[data-ad-preview="message"]',
+    '.userContent',
+    'div[data-testid="post_message"] span'
+]
+
+# Post permalinks: /groups/<group>/posts/<id>, /groups/<group>/permalink/<id>, ?story_fbid=<id>, /posts/<id>
+GROUP_PERMALINK_PATTERN = re.compile(r'/groups/([^/?#]+)/(?:posts|permalink)/(\d+)')
+STORY_FBID_PATTERN = re.compile(r'[?&]story_fbid=(\d+)')
+POSTS_PATTERN = re.compile(r'/posts/(\d+)')
+GROUP_URL_PATTERN = re.compile(r'/groups/([^/?#]+)')
+
+# Anything that is not a letter or digit, for content fingerprints
+NON_WORD_PATTERN = re.compile(r'[\W_]+')
+
+# What malformed markup or payloads raise while being parsed; anything else propagates
+PARSE_ERRORS = (AttributeError, KeyError, TypeError, ValueError, OverflowError)
+
+# Attribute stamped onto feed nodes once they have been handed to the extractor
+SEEN_ATTRIBUTE = 'data-fbs-seq'
+
+# Stamps every unseen, rendered post node and, unless told not to, returns those nodes' HTML.
+# Nodes with no text yet are still placeholders and are left for a later pass;
+# nodes inside another post are its comments and travel with their post's HTML.
+NEW_ARTICLES_SCRIPT = """
+var selector = arguments[0], attribute = arguments[1], articleSelector = arguments[2], withHtml = arguments[3];
+var nodes = document.querySelectorAll(selector);
+var fresh = [];
+window.__fbsSeq = window.__fbsSeq || 0;
+for (var i = 0; i < nodes.length; i++) {
+    if (nodes[i].parentElement && nodes[i].parentElement.closest(articleSelector)) { continue; }
+    if (!nodes[i].textContent.trim()) { continue; }
+    nodes[i].setAttribute(attribute, String(window.__fbsSeq++));
+    if (withHtml) { fresh.push(nodes[i].outerHTML); }
+}
+return fresh;
+"""
+
+def parse_page(page_source: str) -> BeautifulSoup:
+    """Parse a driver.page_source snapshot"""
+    return BeautifulSoup(page_source, 'lxml')
+
+def find_articles(soup: BeautifulSoup) -> List:
+    """Return every top-level post node in the snapshot, in document order"""
+    nodes = soup.select(ARTICLE_SELECTOR)
+    node_ids = {id(node) for node in nodes}
+    # Comments are article nodes too; they belong to the post that contains them
+    return [node for node in nodes if not any(id(parent) in node_ids for parent in node.parents)]
+
+class FeedCursor:
+    """Hands out only the feed posts added since the previous call"""
+    
+    def __init__(self, driver, selector: str = ARTICLE_SELECTOR):
+        self.driver = driver
+        self.article_selector = selector
+        self.selector = ', '.join(
+            f'{part.strip()}:not([{SEEN_ATTRIBUTE}])' for part in selector.split(',')
+        )
+    
+    def fetch_new(self) -> List:
+        """Return the parsed post nodes that appeared since the last call"""
+        fragments = self.driver.execute_script(
+            NEW_ARTICLES_SCRIPT, self.selector, SEEN_ATTRIBUTE, self.article_selector, True
+        ) or []
+        
+        articles = []
+        for fragment in fragments:
+            article = parse_page(fragment).find(attrs={SEEN_ATTRIBUTE: True})
+            if article is not None:
+                articles.append(article)
+        return articles
+    
+    def skip_new(self):
+        """Mark the posts that appeared since the last call as seen without transferring or parsing them"""
+        self.driver.execute_script(NEW_ARTICLES_SCRIPT, self.selector, SEEN_ATTRIBUTE, self.article_selector, False)
+
+def first_text(node, kind: str, selectors: List[str], stats=None) -> str:
+    """Text of the first selector that matches non-empty text, trying the best-scoring selectors first"""
+    if stats is not None:
+        selectors = stats.ordered(kind, selectors)
+
+    for selector in selectors:
+        element = node.select_one(selector)
+        text = element.get_text(' ', strip=True) if element is not None else ''
+        if stats is not None:
+            stats.record(kind, selector, bool(text))
+        if text:
+            return text
+    return ''
+
+def extract_group_name(soup: BeautifulSoup, stats=None) -> str:
+    """Extract the group name from a page snapshot"""
+    try:
+        return first_text(soup, 'group_name', GROUP_NAME_SELECTORS, stats) or "Unknown Group"
+
+    except PARSE_ERRORS as e:
+        logger.warning(f"Could not extract group name: {str(e)}")
+        return "Unknown Group"
+
+def make_post_id(author_name: str, content: str, group_name: str) -> str:
+    """Fallback post ID from author and content, for posts without a resolvable permalink"""
+    unique_string = f"{author_name}_{content[:100]}_{group_name}"
+    return hashlib.md5(unique_string.encode()).hexdigest()
+
+def content_fingerprint(content: str) -> str:
+    """Hash of the normalised text, so edits to case, spacing or punctuation still match"""
+    normalized = NON_WORD_PATTERN.sub(' ', content.lower()).strip()
+    return hashlib.md5(normalized.encode()).hexdigest() if normalized else ''
+
+def canonical_post_url(story_id: str, group_id: Optional[str] = None) -> str:
+    if group_id:
+        return f"https://www.facebook.com/groups/{group_id}/posts/{story_id}/"
+    return f"https://www.facebook.com/{story_id}"
+
+def parse_permalink(href: str) -> Tuple[str, Optional[str]]:
+    """Return (story_id, group_id) for a post permalink, or ('', None)"""
+    match = GROUP_PERMALINK_PATTERN.search(href)
+    if match:
+        return match.group(2), match.group(1)
+    match = STORY_FBID_PATTERN.search(href) or POSTS_PATTERN.search(href)
+    if match:
+        return match.group(1), None
+    return '', None
+
+def resolve_permalink(article, group_url: str = '') -> Tuple[str, str]:
+    """Return (story_id, canonical post_url) from the post's anchors, or ('', '')"""
+    for anchor in article.select('a[href]'):
+        story_id, group_id = parse_permalink(anchor.get('href') or '')
+        if story_id:
+            if group_id is None:
+                group_match = GROUP_URL_PATTERN.search(group_url)
+                group_id = group_match.group(1) if group_match else None
+            return story_id, canonical_post_url(story_id, group_id)
+    return '', ''
+
+def extract_author(article) -> Tuple[str, str]:
+    """Return (author_name, author_url) for a post node"""
+    author_link = article.select_one(AUTHOR_SELECTOR)
+    if author_link is None:
+        return '', ''
+    return author_link.get_text(strip=True), author_link.get('href') or ''
+
+def extract_content(article, stats=None) -> str:
+    """Return the post text from the first content selector that has any"""
+    return first_text(article, 'content', CONTENT_SELECTORS, stats)
+
+def extract_post_data(article, group_name: str, group_url: str, stats=None) -> Optional[Dict]:
+    """Extract data from a single parsed post node"""
+    try:
+        post_data = {
+            'group_name': group_name,
+            'author_name': '',
+            'author_url': '',
+            'content': '',
+            'timestamp': None,
+            'likes': 0,
+            'comments': 0,
+            'shares': 0,
+            'post_url': '',
+            'post_id': '',
+            'content_hash': '',
+            'media_urls': []
+        }
+
+        post_data['author_name'], post_data['author_url'] = extract_author(article)
+        post_data['content'] = extract_content(article, stats)
+        post_data.update(extract_metrics(article))
+
+        # The story ID is the canonical key; the content hash only flags near-duplicates
+        story_id, post_data['post_url'] = resolve_permalink(article, group_url)
+        post_data['content_hash'] = content_fingerprint(post_data['content'])
+        post_data['post_id'] = story_id or make_post_id(post_data['author_name'], post_data['content'], group_name)
+
+        # Set timestamp to current time if not found
+        post_data['timestamp'] = datetime.now()
+
+        return post_data
+
+    except PARSE_ERRORS as e:
+        logger.error(f"Error extracting post data: {str(e)}")
+        return None
+
+def extract_feed(page_source: str, group_name: str, group_url: str) -> List[Dict]:
+    """Extract every post in a page snapshot"""
+    posts = []
+    for article in find_articles(parse_page(page_source)):
+        post_data = extract_post_data(article, group_name, group_url)
+        if post_data:
+            posts.append(post_data)
+    return posts
@@ -0,0 +1,88 @@
+import time
+import queue
+import logging
+import threading
+from datetime import datetime
+from typing import List, Dict
+from decouple import config
+from .database import SessionLocal
+from .models import JobLog
+
+logger = logging.getLogger(__name__)
+
+LOG_FLUSH_SIZE = config('JOB_LOG_FLUSH_SIZE', default=50, cast=int)
+LOG_FLUSH_INTERVAL = config('JOB_LOG_FLUSH_INTERVAL', default=2.0, cast=float)
+LOG_QUEUE_SIZE = config('JOB_LOG_QUEUE_SIZE', default=1000, cast=int)
+
+# How long log() blocks on a full queue before dropping the line
+LOG_PUT_TIMEOUT = 5.0
+
+_STOP = object()
+
+class JobLogSink:
+    """Batches JobLog rows on a background thread with its own database session"""
+
+    def __init__(self, job_id: int, flush_size: int = LOG_FLUSH_SIZE,
+                 flush_interval: float = LOG_FLUSH_INTERVAL, queue_size: int = LOG_QUEUE_SIZE):
+        self.job_id = job_id
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, name=f"joblog-{job_id}", daemon=True)
+        self.thread.start()
+
+    def log(self, level: str, message: str):
+        """Queue a log line; blocks while the queue is full so producers slow down"""
+        row = {
+            'job_id': self.job_id,
+            'level': level,
+            'message': message,
+            # Stamped now, not at flush time, so batching does not reorder or delay entries
+            'timestamp': datetime.utcnow()
+        }
+        try:
+            self.queue.put(row, timeout=LOG_PUT_TIMEOUT)
+        except queue.Full:
+            logger.warning(f"Job log queue full, dropped message for job {self.job_id}: {message}")
+
+    def close(self):
+        """Flush everything queued so far and stop the background thread"""
+        if not self.thread.is_alive():
+            return
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def _run(self):
+        db = SessionLocal()
+        batch: List[Dict] = []
+        deadline = time.monotonic() + self.flush_interval
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    break
+                if item is not None:
+                    batch.append(item)
+
+                if len(batch) >= self.flush_size or time.monotonic() >= deadline:
+                    self._write(db, batch)
+                    batch = []
+                    deadline = time.monotonic() + self.flush_interval
+
+            self._write(db, batch)
+        finally:
+            db.close()
+
+    def _write(self, db, batch: List[Dict]):
+        if not batch:
+            return
+        try:
+            db.bulk_insert_mappings(JobLog, batch)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write {len(batch)} job log entries: {str(e)}")
@@ -0,0 +1,80 @@
+import re
+from typing import Dict, List, Tuple
+
+# A count with optional separators and magnitude suffix: "17", "1,234", "1.234", "1 234", "1.2K", "3,5 k", "2M"
+COUNT_PATTERN = re.compile(r'(\d+(?:[.,\s]\d+)*)\s*([kmb])?(?![a-z])', re.IGNORECASE)
+
+SEPARATOR_PATTERN = re.compile(r'[.,\s]')
+
+SUFFIX_MULTIPLIERS = {'k': 1_000, 'm': 1_000_000, 'b': 1_000_000_000}
+
+# Which counter an aria-label belongs to; checked in this order so "Leave a comment" is never a like
+METRIC_PATTERNS = [
+    ('comments', re.compile(r'comment', re.IGNORECASE)),
+    ('shares', re.compile(r'share', re.IGNORECASE)),
+    ('likes', re.compile(r'like|reaction', re.IGNORECASE)),
+]
+
+LABEL_SELECTOR = '[aria-label]'
+
+def _count_value(match: re.Match) -> int:
+    """Value of a COUNT_PATTERN match, honouring K/M/B suffixes and locale separators"""
+    number, suffix = match.groups()
+    parts = SEPARATOR_PATTERN.split(number)
+
+    if len(parts) == 1:
+        value = float(number)
+    elif all(len(part) == 3 for part in parts[1:]) and not (suffix and len(parts) == 2):
+        # "1,234" / "1.234" / "1 234": thousands separators
+        value = float(''.join(parts))
+    else:
+        # "1.2K" / "1,2K": the last separator is a decimal point
+        value = float(''.join(parts[:-1]) + '.' + parts[-1])
+
+    if suffix:
+        value *= SUFFIX_MULTIPLIERS[suffix.lower()]
+    return int(round(value))
+
+def _keyword_positions(text: str) -> List[Tuple[int, int, str]]:
+    """(start, end, field) of every counter keyword in the text"""
+    positions = []
+    for field, pattern in METRIC_PATTERNS:
+        positions.extend((match.start(), match.end(), field) for match in pattern.finditer(text))
+    return positions
+
+def label_counts(label: str) -> Dict[str, int]:
+    """Counters in a label, each number paired with the keyword right after it ("12 reactions, 3 comments")
+    or, failing that, right before it ("Like: 12 people")"""
+    numbers = list(COUNT_PATTERN.finditer(label))
+    counts = {}
+    for index, match in enumerate(numbers):
+        # Only the text up to the neighbouring numbers can describe this one
+        following = label[match.end():numbers[index + 1].start() if index + 1 < len(numbers) else len(label)]
+        preceding = label[numbers[index - 1].end() if index else 0:match.start()]
+
+        after = _keyword_positions(following)
+        before = _keyword_positions(preceding)
+        if after:
+            field = min(after)[2]
+        elif before:
+            field = max(before, key=lambda position: position[1])[2]
+        else:
+            continue
+        counts.setdefault(field, _count_value(match))
+    return counts
+
+def extract_metrics(article) -> Dict[str, int]:
+    """Return likes, comments and shares from a single pass over the post's aria-labels"""
+    metrics = {'likes': 0, 'comments': 0, 'shares': 0}
+    found = set()
+
+    for element in article.select(LABEL_SELECTOR):
+        # Labels without a number ("Like", "Leave a comment") are buttons, not counters
+        for field, count in label_counts(element.get('aria-label') or '').items():
+            if field not in found:
+                metrics[field] = count
+                found.add(field)
+        if len(found) == len(metrics):
+            break
+
+    return metrics
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean, Float, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -24,10 +24,13 @@ class Job(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     name = Column(String, nullable=False)
     group_urls = Column(JSON)  # List of Facebook group URLs
-    status = Column(String, default="created")  # created, running, paused, completed, failed
+    status = Column(String, default="created")  # created, queued, running, stopping, paused, completed, failed
     config = Column(JSON)  # Scraping configuration
     total_posts = Column(Integer, default=0)
     last_run = Column(DateTime)
+    next_run_at = Column(DateTime, index=True)  # Set only for jobs with a schedule in their config
+    checkpoint = Column(JSON)  # Groups finished and per-group progress of a paused or failed run
+    run_id = Column(String)  # Token of the latest run; its stop flag is keyed by it
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
@@ -37,6 +40,12 @@ class Job(Base):
 
 class Post(Base):
     __tablename__ = "posts"
+    # Keyset pagination walks (job_id, scraped_at, id); the filtered variants keep group/author lookups on an index
+    __table_args__ = (
+        Index("ix_posts_job_scraped", "job_id", "scraped_at", "id"),
+        Index("ix_posts_job_group_scraped", "job_id", "group_name", "scraped_at", "id"),
+        Index("ix_posts_job_author_scraped", "job_id", "author_name", "scraped_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(Integer, ForeignKey("jobs.id"))
@@ -50,6 +59,7 @@ class Post(Base):
     comments = Column(Integer, default=0)
     shares = Column(Integer, default=0)
     post_url = Column(String)
+    content_hash = Column(String, index=True)  # Normalised-content fingerprint for near-duplicate detection
     media_urls = Column(JSON)
     scraped_at = Column(DateTime, server_default=func.now())
     
@@ -66,3 +76,72 @@ class JobLog(Base):
     
     job = relationship("Job", back_populates="logs")
 
+
+class SelectorStat(Base):
+    __tablename__ = "selector_stats"
+    __table_args__ = (UniqueConstraint("scope", "kind", "selector", name="uq_selector_stats_scope_kind_selector"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String, index=True)  # Facebook group the stats were learned on
+    kind = Column(String)  # group_name, content
+    selector = Column(String)
+    hits = Column(Integer, default=0)
+    misses = Column(Integer, default=0)
+    score = Column(Float, default=0.5)  # Exponentially weighted recent hit rate
+    last_hit = Column(DateTime)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class GroupCursor(Base):
+    __tablename__ = "group_cursors"
+    __table_args__ = (UniqueConstraint("job_id", "group_url", name="uq_group_cursors_job_group"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), index=True)
+    group_url = Column(String, nullable=False)
+    newest_post_id = Column(String)  # High-water mark: incremental runs stop when the feed reaches this post
+    newest_post_timestamp = Column(DateTime)
+    last_scraped_at = Column(DateTime)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class UserStat(Base):
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_jobs = Column(Integer, default=0)
+    active_jobs = Column(Integer, default=0)  # Jobs with status running
+    total_posts = Column(Integer, default=0)
+    last_scraped_at = Column(DateTime)
+    reconciled_at = Column(DateTime)  # Last time the counters were recomputed from the source tables
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class GroupStat(Base):
+    __tablename__ = "group_stats"
+    __table_args__ = (UniqueConstraint("job_id", "group_name", name="uq_group_stats_job_group"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), index=True)
+    group_name = Column(String, nullable=False)  # Posts without a group name count under ''
+    post_count = Column(Integer, default=0)
+    last_scraped_at = Column(DateTime)
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+    # Artifacts are looked up by what they contain: the job, the export options and the post set's version
+    __table_args__ = (
+        Index("ix_export_jobs_artifact", "job_id", "format", "columns", "max_post_id", "post_count"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"))
+    format = Column(String, nullable=False)
+    columns = Column(String, nullable=False)  # Comma-separated projection, in output order
+    status = Column(String, default="pending")  # pending, running, completed, failed, expired
+    max_post_id = Column(Integer)  # Newest post included; posts added later are not in the artifact
+    post_count = Column(Integer)
+    artifact_path = Column(String)
+    size_bytes = Column(Integer)
+    error = Column(Text)
+    created_at = Column(DateTime, server_default=func.now())
+    completed_at = Column(DateTime)
+    
+    job = relationship("Job")
@@ -0,0 +1,97 @@
+import json
+import logging
+from collections import Counter
+from typing import Dict, List, Iterable, Optional
+from decouple import config
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# Launch-time Chrome preference; pooled browsers keep it for their lifetime
+BLOCK_IMAGES = config('BLOCK_IMAGES', default=True, cast=bool)
+
+# URL patterns passed to Network.setBlockedURLs, by resource category
+BLOCK_PATTERNS = {
+    'images': ['*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.ico*'],
+    'media': ['*.mp4*', '*.webm*', '*.m3u8*', '*.mpd*', '*.m4s*', '*video*.fbcdn.net/*'],
+    'fonts': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*'],
+    'tracking': [
+        '*facebook.com/tr/*',
+        '*facebook.com/tr?*',
+        '*/ajax/bz*',
+        '*/ajax/bnzai*',
+        '*/logging/*',
+        '*google-analytics.com/*',
+        '*doubleclick.net/*',
+    ],
+}
+
+DEFAULT_BLOCKED_RESOURCES = ['images', 'media', 'fonts', 'tracking']
+
+def blocked_url_patterns(categories: Iterable[str]) -> List[str]:
+    """Expand resource categories into URL patterns"""
+    patterns = []
+    for category in categories:
+        if category not in BLOCK_PATTERNS:
+            logger.warning(f"Unknown resource category to block: {category}")
+            continue
+        patterns.extend(BLOCK_PATTERNS[category])
+    return patterns
+
+def apply_resource_blocking(driver, categories: Optional[Iterable[str]] = None) -> List[str]:
+    """Block the given resource categories for every request the driver makes"""
+    if categories is None:
+        categories = DEFAULT_BLOCKED_RESOURCES
+    patterns = blocked_url_patterns(categories)
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    return patterns
+
+class NetworkMonitor:
+    """Reads the driver's performance log and keeps per-group network statistics"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.request_types: Dict[str, str] = {}
+        self.blocked = Counter()
+        self.bytes_received = 0
+
+    def drain(self) -> List[Dict]:
+        """Consume pending DevTools events, update the counters and return the events"""
+        try:
+            entries = self.driver.get_log('performance')
+        except WebDriverException as e:
+            logger.debug(f"Performance log unavailable: {str(e)}")
+            return []
+
+        events = []
+        for entry in entries:
+            try:
+                event = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+
+            method = event.get('method')
+            params = event.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                self.request_types[params.get('requestId')] = params.get('type', 'Other')
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                request_type = params.get('type') or self.request_types.get(params.get('requestId'), 'Other')
+                self.blocked[request_type] += 1
+            elif method == 'Network.loadingFinished':
+                self.bytes_received += int(params.get('encodedDataLength') or 0)
+            events.append(event)
+
+        return events
+
+    def summary(self) -> str:
+        blocked = ', '.join(f"{request_type}: {count}" for request_type, count in self.blocked.most_common())
+        return (
+            f"Blocked {sum(self.blocked.values())} requests ({blocked or 'none'}); "
+            f"received {self.bytes_received / 1024:.0f} KB"
+        )
+
+    def reset(self):
+        self.request_types.clear()
+        self.blocked.clear()
+        self.bytes_received = 0
@@ -0,0 +1,34 @@
+import json
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from .models import Post
+
+def encode_cursor(post: Post) -> str:
+    """Opaque cursor pointing just past the given post"""
+    raw = json.dumps([post.scraped_at.isoformat(), post.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError on anything it did not produce"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        scraped_at, post_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(scraped_at), int(post_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def paginate_posts(query: Query, cursor: Optional[str], limit: int) -> Tuple[list, Optional[str]]:
+    """Newest-first page of posts after the cursor, plus the cursor for the next page"""
+    if cursor:
+        scraped_at, post_id = decode_cursor(cursor)
+        # Row-value comparison lets the (job_id, scraped_at, id) index seek straight to the page
+        query = query.filter(tuple_(Post.scraped_at, Post.id) < tuple_(scraped_at, post_id))
+
+    # One extra row tells whether another page exists without a COUNT
+    posts = query.order_by(Post.scraped_at.desc(), Post.id.desc()).limit(limit + 1).all()
+    if len(posts) > limit:
+        return posts[:limit], encode_cursor(posts[limit - 1])
+    return posts, None
@@ -0,0 +1,222 @@
+import re
+import time
+import uuid
+import logging
+from typing import Callable, Optional
+import redis
+from decouple import config
+from .control import get_redis
+from .selector_stats import group_scope
+from .extractor import find_articles
+
+logger = logging.getLogger(__name__)
+
+# Page loads allowed per minute across all workers, and per group
+NAV_RATE_GLOBAL = config('NAV_RATE_GLOBAL_PER_MIN', default=20.0, cast=float) / 60
+NAV_BURST_GLOBAL = config('NAV_BURST_GLOBAL', default=5, cast=int)
+NAV_RATE_GROUP = config('NAV_RATE_GROUP_PER_MIN', default=1.0, cast=float) / 60
+NAV_BURST_GROUP = config('NAV_BURST_GROUP', default=1, cast=int)
+
+# Browser sessions on Facebook at once across all workers; a crashed worker's slot expires after the lease
+MAX_CONCURRENT_SESSIONS = config('MAX_CONCURRENT_SESSIONS', default=4, cast=int)
+SESSION_LEASE_SECONDS = config('SESSION_LEASE_SECONDS', default=3600, cast=int)
+
+# Each block page divides the rates by this factor, up to the maximum, until the penalty expires
+BLOCK_BACKOFF_FACTOR = 2
+MAX_BLOCK_PENALTY = config('MAX_BLOCK_PENALTY', default=16, cast=float)
+BLOCK_PENALTY_TTL = config('BLOCK_PENALTY_TTL', default=1800, cast=int)
+
+# Longest a scraper waits for a token or a session slot before giving up; by default twice the
+# gap between tokens of a fully penalised bucket, and the penalty is capped to keep within it
+SLOWEST_RATE = min(NAV_RATE_GLOBAL, NAV_RATE_GROUP)
+RATE_LIMIT_MAX_WAIT = config('RATE_LIMIT_MAX_WAIT', default=2 * MAX_BLOCK_PENALTY / SLOWEST_RATE, cast=float)
+MAX_BLOCK_PENALTY = max(1.0, min(MAX_BLOCK_PENALTY, RATE_LIMIT_MAX_WAIT * SLOWEST_RATE / 2))
+POLL_INTERVAL = 5.0
+
+# Held session slots are refreshed at most this often, well inside the lease
+HEARTBEAT_INTERVAL = min(60.0, SESSION_LEASE_SECONDS / 4)
+
+GLOBAL_SCOPE = 'global'
+SESSIONS_KEY = 'ratelimit:sessions'
+
+BLOCK_URL_MARKERS = ('/checkpoint', '/login')
+BLOCK_TEXT_PATTERN = re.compile(
+    r"temporarily blocked|you.re going too fast|you can.t use this feature right now|security check",
+    re.IGNORECASE
+)
+
+# Refill each bucket and take one token from all of them, or none if any is empty.
+# Returns the seconds to wait before retrying, as a string since Lua numbers become integers.
+TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local capacity = tonumber(ARGV[2 * i])
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - 1
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+end
+return tostring(wait)
+"""
+
+# Sorted set of session tokens scored by their last heartbeat
+SEMAPHORE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[3]))
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) or redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[1])
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+    return 1
+end
+return 0
+"""
+
+class RateLimitTimeout(Exception):
+    """Gave up waiting for a navigation token or session slot; the browser itself is fine"""
+
+class SessionSlotBusy(RateLimitTimeout):
+    """Every browser-session slot stayed taken; the job waits its turn in the queue instead"""
+
+class GroupBlocked(RateLimitTimeout):
+    """Facebook served a block or checkpoint page; the group is retried once its penalty has eased"""
+
+def bucket_key(scope: str) -> str:
+    return f"ratelimit:bucket:{scope}"
+
+def penalty_key(scope: str) -> str:
+    return f"ratelimit:penalty:{scope}"
+
+def is_block_page(current_url: str, soup=None) -> bool:
+    """Whether Facebook answered with a checkpoint, login wall or temporary block instead of the group"""
+    if any(marker in (current_url or '') for marker in BLOCK_URL_MARKERS):
+        return True
+    # Posts may mention these phrases, so the text is only checked on pages without a feed
+    if soup is None or find_articles(soup):
+        return False
+    return soup.find(string=BLOCK_TEXT_PATTERN) is not None
+
+class NavigationGovernor:
+    """Redis token buckets and a session semaphore shared by every worker hitting Facebook"""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.session_token = f"job-{job_id}-{uuid.uuid4().hex[:8]}"
+        self.has_session = False
+        self.last_heartbeat = 0.0
+
+    def _penalties(self, client, scope: str):
+        values = client.mget(penalty_key(GLOBAL_SCOPE), penalty_key(scope))
+        return [min(max(float(value or 1), 1.0), MAX_BLOCK_PENALTY) for value in values]
+
+    def _wait(self, attempt: Callable[[], float], what: str, should_stop: Optional[Callable[[], bool]],
+              timeout_error: type = RateLimitTimeout) -> bool:
+        """Retry until attempt() returns 0; False if stopped first. Redis outages fail open."""
+        deadline = time.monotonic() + RATE_LIMIT_MAX_WAIT
+        waited = False
+        while True:
+            try:
+                wait = attempt()
+            except redis.RedisError as e:
+                logger.warning(f"Rate limiter unavailable, not waiting for {what}: {str(e)}")
+                return True
+
+            if wait <= 0:
+                if waited:
+                    logger.info(f"Job {self.job_id} acquired {what}")
+                return True
+            if should_stop and should_stop():
+                return False
+            if time.monotonic() + min(wait, POLL_INTERVAL) > deadline:
+                raise timeout_error(f"Waited more than {RATE_LIMIT_MAX_WAIT:.0f}s for {what}")
+
+            waited = True
+            time.sleep(min(wait, POLL_INTERVAL))
+
+    def acquire_session(self, should_stop: Optional[Callable[[], bool]] = None) -> bool:
+        """Block until one of the global browser-session slots is free"""
+        client = get_redis()
+
+        def attempt() -> float:
+            acquired = client.eval(SEMAPHORE_SCRIPT, 1, SESSIONS_KEY, self.session_token,
+                                   MAX_CONCURRENT_SESSIONS, SESSION_LEASE_SECONDS)
+            return 0 if acquired else POLL_INTERVAL
+
+        self.has_session = self._wait(attempt, "a browser session slot", should_stop, SessionSlotBusy)
+        self.last_heartbeat = time.monotonic()
+        return self.has_session
+
+    def heartbeat(self, force: bool = False):
+        """Keep a held session slot, and the set holding it, from expiring during a long scrape"""
+        if not self.has_session or (not force and time.monotonic() - self.last_heartbeat < HEARTBEAT_INTERVAL):
+            return
+        try:
+            pipeline = get_redis().pipeline()
+            pipeline.zadd(SESSIONS_KEY, {self.session_token: int(time.time())}, xx=True)
+            pipeline.expire(SESSIONS_KEY, SESSION_LEASE_SECONDS)
+            pipeline.execute()
+            self.last_heartbeat = time.monotonic()
+        except redis.RedisError as e:
+            logger.warning(f"Could not refresh session slot: {str(e)}")
+
+    def release_session(self):
+        if not self.has_session:
+            return
+        try:
+            get_redis().zrem(SESSIONS_KEY, self.session_token)
+        except redis.RedisError as e:
+            logger.warning(f"Could not release session slot (it expires on its own): {str(e)}")
+        self.has_session = False
+
+    def wait_for_navigation(self, group_url: str, should_stop: Optional[Callable[[], bool]] = None) -> bool:
+        """Take a token from the global and per-group buckets before loading a page"""
+        client = get_redis()
+        scope = group_scope(group_url)
+
+        def attempt() -> float:
+            global_penalty, group_penalty = self._penalties(client, scope)
+            self.heartbeat()
+            wait = client.eval(
+                TOKEN_BUCKET_SCRIPT, 2, bucket_key(GLOBAL_SCOPE), bucket_key(scope),
+                NAV_RATE_GLOBAL / global_penalty, NAV_BURST_GLOBAL,
+                NAV_RATE_GROUP / group_penalty, NAV_BURST_GROUP
+            )
+            return float(wait)
+
+        return self._wait(attempt, f"a navigation token for {scope}", should_stop)
+
+    def report_block(self, group_url: str) -> float:
+        """Slow down the group and, more gently, everything else; returns the group's new penalty"""
+        scope = group_scope(group_url)
+        try:
+            client = get_redis()
+            global_penalty, group_penalty = self._penalties(client, scope)
+            group_penalty = min(group_penalty * BLOCK_BACKOFF_FACTOR, MAX_BLOCK_PENALTY)
+            global_penalty = min(global_penalty * (1 + BLOCK_BACKOFF_FACTOR) / 2, MAX_BLOCK_PENALTY)
+
+            pipeline = client.pipeline()
+            pipeline.set(penalty_key(scope), group_penalty, ex=BLOCK_PENALTY_TTL)
+            pipeline.set(penalty_key(GLOBAL_SCOPE), global_penalty, ex=BLOCK_PENALTY_TTL)
+            pipeline.execute()
+            return group_penalty
+        except redis.RedisError as e:
+            logger.warning(f"Could not record block for {scope}: {str(e)}")
+            return 1.0
@@ -0,0 +1,160 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from celery.schedules import crontab
+from decouple import config
+from sqlalchemy.orm import Session
+from .models import Job, JobLog
+from .stats import set_job_status
+from .control import new_run_id
+
+logger = logging.getLogger(__name__)
+
+# How often beat looks for due jobs
+SCHEDULER_TICK_SECONDS = config('SCHEDULER_TICK_SECONDS', default=60.0, cast=float)
+
+# Jobs sharing a schedule start at a stable per-job offset within this window
+SCHEDULE_SPREAD_SECONDS = config('SCHEDULE_SPREAD_SECONDS', default=900, cast=int)
+
+# Upper bounds on jobs dispatched per tick and on scheduled work in flight at once
+SCHEDULER_MAX_DISPATCH = config('SCHEDULER_MAX_DISPATCH', default=20, cast=int)
+SCHEDULER_MAX_ACTIVE_JOBS = config('SCHEDULER_MAX_ACTIVE_JOBS', default=10, cast=int)
+
+# Statuses of a job whose previous run has not finished yet; a stopping run is still winding down
+ACTIVE_STATUSES = ('queued', 'running', 'stopping')
+
+# Statuses that tell a run to wind down, for when the Redis stop flag never arrived
+STOPPED_STATUSES = ('stopping', 'paused')
+
+# A cron expression that never matches stops the search after this long; eight years still reach
+# February 29th when a century year skips its leap day
+MAX_CRON_LOOKAHEAD = timedelta(days=8 * 366)
+
+def parse_schedule(schedule: Dict):
+    """Validate a job's schedule config: {"cron": "0 */6 * * *"} or {"interval_minutes": 360}"""
+    if not isinstance(schedule, dict):
+        raise ValueError("Schedule must be an object with 'cron' or 'interval_minutes'")
+
+    if schedule.get('cron'):
+        fields = str(schedule['cron']).split()
+        if len(fields) != 5:
+            raise ValueError("Cron schedules need 5 fields: minute hour day-of-month month day-of-week")
+        minute, hour, day_of_month, month_of_year, day_of_week = fields
+        return crontab(minute=minute, hour=hour, day_of_month=day_of_month,
+                       month_of_year=month_of_year, day_of_week=day_of_week)
+
+    if schedule.get('interval_minutes'):
+        minutes = float(schedule['interval_minutes'])
+        if minutes < 1:
+            raise ValueError("Interval schedules must be at least 1 minute")
+        return timedelta(minutes=minutes)
+
+    raise ValueError("Schedule must set 'cron' or 'interval_minutes'")
+
+def schedule_offset(job_id: int, window: float) -> int:
+    """Stable pseudo-random offset in seconds, so jobs on the same schedule do not all start together"""
+    if window < 1:
+        return 0
+    digest = hashlib.md5(str(job_id).encode()).hexdigest()
+    return int(digest, 16) % int(window)
+
+def next_cron_time(cron: crontab, after: datetime) -> Optional[datetime]:
+    """First minute after the given time that matches the cron expression"""
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = after + MAX_CRON_LOOKAHEAD
+
+    while moment <= limit:
+        if moment.month not in cron.month_of_year:
+            moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+        elif moment.day not in cron.day_of_month or (moment.weekday() + 1) % 7 not in cron.day_of_week:
+            moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+        elif moment.hour not in cron.hour:
+            moment = moment.replace(minute=0) + timedelta(hours=1)
+        elif moment.minute not in cron.minute:
+            moment += timedelta(minutes=1)
+        else:
+            return moment
+    return None
+
+def next_run_time(schedule: Dict, after: datetime, job_id: int) -> Optional[datetime]:
+    """Next start time for a job, including its spread offset"""
+    parsed = parse_schedule(schedule)
+
+    if isinstance(parsed, timedelta):
+        # Intervals are aligned to a per-job phase rather than to when the last run happened
+        period = parsed.total_seconds()
+        offset = schedule_offset(job_id, min(SCHEDULE_SPREAD_SECONDS, period))
+        elapsed = (after - datetime(1970, 1, 1)).total_seconds() - offset
+        return datetime(1970, 1, 1) + timedelta(seconds=(elapsed // period + 1) * period + offset)
+
+    base = next_cron_time(parsed, after - timedelta(seconds=SCHEDULE_SPREAD_SECONDS))
+    while base is not None:
+        candidate = base + timedelta(seconds=schedule_offset(job_id, SCHEDULE_SPREAD_SECONDS))
+        if candidate > after:
+            return candidate
+        base = next_cron_time(parsed, base)
+    return None
+
+def validate_schedule(schedule: Dict):
+    """parse_schedule, and reject cron expressions that never match (e.g. February 31st)"""
+    parsed = parse_schedule(schedule)
+    if isinstance(parsed, crontab) and next_cron_time(parsed, datetime.now()) is None:
+        raise ValueError(f"Cron expression '{schedule['cron']}' never matches")
+
+def refresh_schedule(job: Job, now: Optional[datetime] = None):
+    """Recompute a job's next_run_at from its config; unscheduled jobs get None"""
+    schedule = (job.config or {}).get('schedule')
+    job.next_run_at = next_run_time(schedule, now or datetime.now(), job.id) if schedule else None
+
+def dispatch_due_jobs(db: Session, enqueue: Callable[[int], None], now: Optional[datetime] = None) -> int:
+    """Queue every scheduled job that is due, oldest first, within the dispatch caps"""
+    now = now or datetime.now()
+
+    active = db.query(Job).filter(Job.status.in_(ACTIVE_STATUSES)).count()
+    capacity = min(SCHEDULER_MAX_DISPATCH, SCHEDULER_MAX_ACTIVE_JOBS - active)
+
+    due = (
+        db.query(Job)
+        .filter(Job.next_run_at.isnot(None), Job.next_run_at <= now)
+        .order_by(Job.next_run_at)
+        .limit(SCHEDULER_MAX_DISPATCH)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    queued = []
+    for job in due:
+        if job.status not in ACTIVE_STATUSES and len(queued) >= capacity:
+            # Left due, so it goes out on a later tick once capacity frees up
+            continue
+
+        try:
+            refresh_schedule(job, now)
+        except ValueError as e:
+            job.next_run_at = None
+            db.add(JobLog(job_id=job.id, level="ERROR", message=f"Invalid schedule disabled: {str(e)}"))
+            continue
+
+        if job.status == "paused":
+            # Paused by the user; the schedule picks up again once the job is started by hand
+            continue
+
+        if job.status in ACTIVE_STATUSES:
+            # Overlapping runs would scrape the same groups twice; wait for the next slot
+            db.add(JobLog(job_id=job.id, level="WARNING",
+                          message=f"Skipped scheduled run; previous run is still {job.status}"))
+            continue
+
+        job.run_id = new_run_id()
+        set_job_status(db, job, "queued")
+        queued.append(job.id)
+
+    db.commit()
+    for job_id in queued:
+        enqueue(job_id)
+
+    dispatched = len(queued)
+    if dispatched:
+        logger.info(f"Dispatched {dispatched} scheduled jobs ({len(due) - dispatched} due jobs deferred or skipped)")
+    return dispatched
@@ -2,59 +2,75 @@ import time
 import random
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import undetected_chromedriver as uc
-from selenium_stealth import stealth
-from fake_useragent import UserAgent
 from bs4 import BeautifulSoup
+from celery.exceptions import SoftTimeLimitExceeded
 import pandas as pd
 from sqlalchemy.orm import Session
 from .database import SessionLocal
 from .models import Job, Post, JobLog
+from . import extractor
+from .dedup import PostDeduplicator, KnownPosts
+from .selector_stats import SelectorRegistry
+from .cursors import save_group_cursor, load_group_cursor, INCREMENTAL_STOP_AFTER
+from .control import stop_requested, request_stop, new_run_id
+from .ratelimit import NavigationGovernor, RateLimitTimeout, SessionSlotBusy, GroupBlocked, is_block_page
+from .joblog import JobLogSink
+from .scrolling import ScrollController
+from .capture import GraphQLCapture
+from .network import NetworkMonitor, apply_resource_blocking, DEFAULT_BLOCKED_RESOURCES
+from .driver_pool import get_driver_pool, TransientDriverError, is_transient_driver_error, DRIVER_CHECKOUT_TIMEOUT
+from .stats import set_job_status
+from .scheduler import STOPPED_STATUSES
+from .writer import bulk_insert_posts, BufferedPostWriter, WRITE_CHUNK_SIZE, FLUSH_SIZE, FLUSH_INTERVAL
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class FacebookGroupScraper:
-    def __init__(self, job_id: int):
+    def __init__(self, job_id: int, log_sink: Optional[JobLogSink] = None, run_id: Optional[str] = None,
+                 known_posts: Optional[KnownPosts] = None):
         self.job_id = job_id
+        # Stop flags belong to one run of the job; set from the job row when the run starts
+        self.run_id = run_id
         self.driver = None
+        self.driver_healthy = True
+        self.network = None
         self.db = SessionLocal()
-        self.user_agent = UserAgent()
+        # Group workers of a parallel job share the parent's log sink
+        self.owns_log_sink = log_sink is None
+        self.log_sink = log_sink or JobLogSink(job_id)
+        # Group workers of a parallel job share the parent's known-post index instead of each loading it
+        self.dedup = PostDeduplicator(self.db, job_id, known=known_posts)
+        self.selector_registry = SelectorRegistry(self.db)
+        self.write_chunk_size = WRITE_CHUNK_SIZE
+        # Set once a pause or cancel request has been seen; the current group then winds down
+        self.stopped = False
+        # Paces page loads and caps browser sessions across every worker
+        self.governor = NavigationGovernor(job_id)
         
-    def setup_driver(self):
-        """Setup Chrome driver with stealth configuration"""
+    def setup_driver(self, config: Optional[Dict] = None, checkout_timeout: Optional[float] = DRIVER_CHECKOUT_TIMEOUT):
+        """Check out a stealth-configured Chrome driver from the worker's pool"""
+        config = config or {}
         try:
-            # Chrome options for stealth mode
-            options = Options()
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option('useAutomationExtension', False)
-            options.add_argument(f'--user-agent={self.user_agent.random}')
-            
-            # Use undetected-chromedriver
-            self.driver = uc.Chrome(options=options, version_main=None)
-            
-            # Apply selenium-stealth
-            stealth(self.driver,
-                languages=["en-US", "en"],
-                vendor="Google Inc.",
-                platform="Win32",
-                webgl_vendor="Intel Inc.",
-                renderer="Intel Iris OpenGL Engine",
-                fix_hairline=True,
-            )
+            # Wait for a free session slot; a stop while waiting leaves the scraper without a driver
+            if not self.governor.acquire_session(self.stop_requested):
+                return
+            
+            # Warm browser from this worker's pool instead of launching a new one
+            self.driver = get_driver_pool().checkout(checkout_timeout, self.stop_requested)
+            if self.driver is None:
+                return
+            self.network = NetworkMonitor(self.driver)
             
-            # Additional stealth measures
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            # Pooled browsers outlive jobs, so blocking is applied on every checkout
+            apply_resource_blocking(self.driver, config.get('block_resources', DEFAULT_BLOCKED_RESOURCES))
             
             logger.info(f"Driver setup completed for job {self.job_id}")
             self.log_message("INFO", "Browser driver initialized successfully")
@@ -62,34 +78,43 @@ class FacebookGroupScraper:
         except Exception as e:
             logger.error(f"Failed to setup driver: {str(e)}")
             self.log_message("ERROR", f"Failed to setup driver: {str(e)}")
+            if is_transient_driver_error(e):
+                raise TransientDriverError(str(e)) from e
             raise
     
-    def human_like_scroll(self):
-        """Simulate human-like scrolling behavior"""
-        scroll_pause_time = random.uniform(2, 5)
-        scroll_height = random.randint(300, 800)
-        
-        self.driver.execute_script(f"window.scrollBy(0, {scroll_height});")
-        time.sleep(scroll_pause_time)
-        
-        # Random chance to scroll back up a bit
-        if random.random() < 0.3:
-            back_scroll = random.randint(100, 300)
-            self.driver.execute_script(f"window.scrollBy(0, -{back_scroll});")
-            time.sleep(random.uniform(1, 2))
+    def human_like_scroll(self, scroller: ScrollController) -> bool:
+        """Scroll the feed and wait until new posts load, the network idles or the wait times out"""
+        return scroller.scroll()
+    
+    def stop_requested(self) -> bool:
+        """Check the job's stop flag; called every scroll so a paused job frees its browser quickly"""
+        if not self.stopped and stop_requested(self.job_id, self.run_id):
+            self.stopped = True
+            self.log_message("INFO", "Stop requested; finishing the current batch")
+        return self.stopped
+    
+    def job_paused(self) -> bool:
+        """Fallback for a stop request that never reached Redis: re-read the job status"""
+        status = self.db.query(Job.status).filter(Job.id == self.job_id).scalar()
+        self.stopped = self.stopped or status in STOPPED_STATUSES
+        return self.stopped
     
     def random_delay(self, min_seconds=2, max_seconds=10):
         """Add random delay to mimic human behavior"""
         delay = random.uniform(min_seconds, max_seconds)
         time.sleep(delay)
     
-    def scrape_group(self, group_url: str, max_posts: int = 100) -> List[Dict]:
-        """Scrape posts from a Facebook group"""
-        posts_data = []
+    def scrape_group(self, group_url: str, max_posts: int = 100, config: Optional[Dict] = None,
+                     posts_scraped: int = 0) -> Iterator[Dict]:
+        """Scrape posts from a Facebook group, yielding each new post as it is found"""
         
         try:
             self.log_message("INFO", f"Starting to scrape group: {group_url}")
             
+            # Shared global and per-group limits; the local delay below only adds jitter
+            if self.stop_requested() or not self.governor.wait_for_navigation(group_url, self.stop_requested):
+                return
+            
             # Navigate to the group
             self.driver.get(group_url)
             self.random_delay(3, 7)
@@ -99,270 +124,412 @@ class FacebookGroupScraper:
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
+            # Selectors that worked on this group before are tried first
+            selector_stats = self.selector_registry.scope(group_url)
+            
+            soup = self.snapshot_page()
+            if is_block_page(self.driver.current_url, soup):
+                # The group stays unfinished in the checkpoint and the job is retried after a backoff
+                penalty = self.governor.report_block(group_url)
+                raise GroupBlocked(f"Facebook served a block or checkpoint page for {group_url}; "
+                                   f"slowing this group down {penalty:.0f}x")
+            
             # Extract group name
-            group_name = self.extract_group_name()
+            group_name = self.extract_group_name(soup, selector_stats)
             
-            posts_scraped = 0
+            config = config or {}
             scroll_attempts = 0
-            max_scroll_attempts = 50
+            max_scroll_attempts = config.get('max_scroll_attempts', 50)
+            cursor = extractor.FeedCursor(self.driver)
+            scroller = ScrollController.from_config(self.driver, config)
+            capture = GraphQLCapture(self.driver) if config.get('capture_graphql') else None
+            
+            # Incremental mode stops once the feed runs into posts stored by earlier runs
+            incremental = config.get('incremental', False)
+            stop_after_known = config.get('incremental_stop_after', INCREMENTAL_STOP_AFTER)
+            known_streak = 0
+            newest_post = None
+            # The previous run's newest post is where this run's new posts end
+            stop_at_post_id = None
+            posts_seen = 0
+            reached_mark = False
+            if incremental:
+                previous = load_group_cursor(self.db, self.job_id, group_url)
+                if previous and previous.newest_post_id:
+                    stop_at_post_id = previous.newest_post_id
+                    self.log_message("INFO", f"Incremental scrape; stopping at newest known post {stop_at_post_id}")
             
             while posts_scraped < max_posts and scroll_attempts < max_scroll_attempts:
-                # Find post elements
-                post_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-pagelet="FeedUnit_0"], [role="article"]')
+                if self.stop_requested():
+                    break
                 
-                for post_element in post_elements[posts_scraped:]:
-                    try:
-                        post_data = self.extract_post_data(post_element, group_name, group_url)
-                        if post_data and not self.is_duplicate_post(post_data['post_id']):
-                            posts_data.append(post_data)
-                            posts_scraped += 1
-                            
-                            if posts_scraped >= max_posts:
-                                break
-                                
-                    except Exception as e:
-                        logger.warning(f"Error extracting post data: {str(e)}")
+                events = self.network.drain()
+                
+                # Structured feed responses are preferred; the DOM is the fallback
+                batch = capture.extract_posts(events, group_name, group_url) if capture else []
+                if batch:
+                    # The same posts are rendered too; stamp them so a later DOM fallback skips them
+                    cursor.skip_new()
+                else:
+                    # Only the posts rendered since the previous scroll are fetched and parsed
+                    for post_element in cursor.fetch_new():
+                        try:
+                            post_data = self.extract_post_data(post_element, group_name, group_url, selector_stats)
+                            if post_data:
+                                batch.append(post_data)
+                        except SoftTimeLimitExceeded:
+                            raise
+                        except Exception as e:
+                            logger.warning(f"Error extracting post data: {str(e)}")
+                            continue
+                
+                # One in-memory pass plus at most one IN (...) query per scroll
+                new_post_ids = self.dedup.filter_new(post_data['post_id'] for post_data in batch)
+                for post_data in batch:
+                    # A pinned mark shows up at the top of the feed, ahead of the new posts, so only a later sighting counts
+                    if post_data['post_id'] == stop_at_post_id and posts_seen:
+                        reached_mark = True
+                        break
+                    posts_seen += 1
+                    
+                    if (post_data['post_id'] not in new_post_ids
+                            or not self.dedup.claim(post_data['post_id'], post_data.get('content_hash'))):
+                        known_streak += 1
+                        if incremental and known_streak >= stop_after_known:
+                            break
                         continue
+                    
+                    # A single known post (e.g. a pinned one) does not end an incremental scrape
+                    known_streak = 0
+                    newest_post = newest_post or post_data
+                    posts_scraped += 1
+                    yield post_data
+                    
+                    if posts_scraped >= max_posts:
+                        break
+                
+                if posts_scraped >= max_posts:
+                    break
+                
+                if reached_mark:
+                    self.log_message("INFO", f"Caught up at the newest post from the previous run after {posts_seen} posts")
+                    break
+                
+                if incremental and known_streak >= stop_after_known:
+                    self.log_message("INFO", f"Caught up after {known_streak} consecutive known posts")
+                    break
                 
-                # Scroll to load more posts
-                self.human_like_scroll()
+                # A long scroll session must not lose its session slot
+                self.governor.heartbeat()
+                
+                # Scroll and wait for the feed to grow rather than for a fixed time
+                self.human_like_scroll(scroller)
                 scroll_attempts += 1
                 
                 # Check if we've reached the end
+                if scroller.at_end:
+                    self.log_message("INFO", f"Reached end of feed after {scroll_attempts} scrolls")
+                    break
+                
                 if scroll_attempts % 10 == 0:
                     self.log_message("INFO", f"Scraped {posts_scraped} posts so far...")
             
-            self.log_message("INFO", f"Completed scraping group. Total posts: {len(posts_data)}")
-            
+            if self.stopped:
+                self.log_message("INFO", f"Stopped scraping group after {posts_scraped} posts")
+            else:
+                self.log_message("INFO", f"Completed scraping group. Total posts: {posts_scraped}")
+            self.selector_registry.save(selector_stats)
+            save_group_cursor(self.db, self.job_id, group_url, newest_post)
+            self.network.drain()
+            self.log_message("INFO", f"Network: {self.network.summary()}")
+            self.network.reset()
+            
+        except SoftTimeLimitExceeded:
+            raise
+        except RateLimitTimeout as e:
+            # The browser is fine; the job is retried once the limits have eased
+            self.log_message("WARNING", f"Group not scraped: {str(e)}")
+            raise
         except Exception as e:
             logger.error(f"Error scraping group {group_url}: {str(e)}")
             self.log_message("ERROR", f"Error scraping group: {str(e)}")
-        
-        return posts_data
+            
+            # A dead browser fails every later group too, so the whole job is retried instead
+            if is_transient_driver_error(e):
+                self.driver_healthy = False
+                raise TransientDriverError(str(e)) from e
+    
+    def snapshot_page(self):
+        """Take a single page_source snapshot and parse it offline"""
+        return extractor.parse_page(self.driver.page_source)
     
-    def extract_group_name(self) -> str:
+    def extract_group_name(self, soup=None, stats=None) -> str:
         """Extract the group name from the page"""
-        try:
-            # Try multiple selectors for group name
-            selectors = [
-                'h1[data-testid="group-name"]',
-                'h1',
-                '[data-testid="page-title"]'
-            ]
-            
-            for selector in selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    if element.text.strip():
-                        return element.text.strip()
-                except NoSuchElementException:
-                    continue
-            
-            return "Unknown Group"
-            
-        except Exception as e:
-            logger.warning(f"Could not extract group name: {str(e)}")
-            return "Unknown Group"
+        if soup is None:
+            soup = self.snapshot_page()
+        return extractor.extract_group_name(soup, stats)
     
-    def extract_post_data(self, post_element, group_name: str, group_url: str) -> Dict:
-        """Extract data from a single post element"""
-        try:
-            post_data = {
-                'group_name': group_name,
-                'author_name': '',
-                'author_url': '',
-                'content': '',
-                'timestamp': None,
-                'likes': 0,
-                'comments': 0,
-                'shares': 0,
-                'post_url': '',
-                'post_id': '',
-                'media_urls': []
-            }
-            
-            # Extract author information
-            try:
-                author_link = post_element.find_element(By.CSS_SELECTOR, 'a[role="link"]')
-                post_data['author_name'] = author_link.text.strip()
-                post_data['author_url'] = author_link.get_attribute('href')
-            except NoSuchElementException:
-                pass
-            
-            # Extract post content
-            try:
-                content_selectors = [
-                    '[data-testid="post_message"]',
-                    '[data-ad-preview="message"]',
-                    '.userContent',
-                    'div[data-testid="post_message"] span'
-                ]
-                
-                for selector in content_selectors:
-                    try:
-                        content_element = post_element.find_element(By.CSS_SELECTOR, selector)
-                        if content_element.text.strip():
-                            post_data['content'] = content_element.text.strip()
-                            break
-                    except NoSuchElementException:
-                        continue
-            except Exception:
-                pass
-            
-            # Extract engagement metrics
-            try:
-                # Likes
-                like_elements = post_element.find_elements(By.CSS_SELECTOR, '[aria-label*="like"], [aria-label*="reaction"]')
-                for element in like_elements:
-                    aria_label = element.get_attribute('aria-label') or ''
-                    if 'like' in aria_label.lower():
-                        # Extract number from aria-label
-                        import re
-                        numbers = re.findall(r'\d+', aria_label)
-                        if numbers:
-                            post_data['likes'] = int(numbers[0])
-                        break
-                
-                # Comments
-                comment_elements = post_element.find_elements(By.CSS_SELECTOR, '[aria-label*="comment"]')
-                for element in comment_elements:
-                    aria_label = element.get_attribute('aria-label') or ''
-                    if 'comment' in aria_label.lower():
-                        import re
-                        numbers = re.findall(r'\d+', aria_label)
-                        if numbers:
-                            post_data['comments'] = int(numbers[0])
-                        break
-                
-                # Shares
-                share_elements = post_element.find_elements(By.CSS_SELECTOR, '[aria-label*="share"]')
-                for element in share_elements:
-                    aria_label = element.get_attribute('aria-label') or ''
-                    if 'share' in aria_label.lower():
-                        import re
-                        numbers = re.findall(r'\d+', aria_label)
-                        if numbers:
-                            post_data['shares'] = int(numbers[0])
-                        break
-                        
-            except Exception as e:
-                logger.debug(f"Could not extract engagement metrics: {str(e)}")
-            
-            # Generate a unique post ID based on content and author
-            import hashlib
-            unique_string = f"{post_data['author_name']}_{post_data['content'][:100]}_{group_name}"
-            post_data['post_id'] = hashlib.md5(unique_string.encode()).hexdigest()
-            
-            # Set timestamp to current time if not found
-            post_data['timestamp'] = datetime.now()
-            
-            return post_data
-            
-        except Exception as e:
-            logger.error(f"Error extracting post data: {str(e)}")
-            return None
+    def extract_post_data(self, post_element, group_name: str, group_url: str, stats=None) -> Dict:
+        """Extract data from a single parsed post node"""
+        return extractor.extract_post_data(post_element, group_name, group_url, stats)
     
     def is_duplicate_post(self, post_id: str) -> bool:
-        """Check if post already exists in database"""
-        existing_post = self.db.query(Post).filter(Post.post_id == post_id).first()
-        return existing_post is not None
+        """Check if post was already seen in this run or exists in database"""
+        return not self.dedup.filter_new([post_id])
     
     def save_posts_to_db(self, posts_data: List[Dict]):
-        """Save scraped posts to database"""
+        """Save scraped posts to database and return how many rows were inserted"""
         try:
-            for post_data in posts_data:
-                if not self.is_duplicate_post(post_data['post_id']):
-                    post = Post(
-                        job_id=self.job_id,
-                        post_id=post_data['post_id'],
-                        group_name=post_data['group_name'],
-                        author_name=post_data['author_name'],
-                        author_url=post_data['author_url'],
-                        content=post_data['content'],
-                        timestamp=post_data['timestamp'],
-                        likes=post_data['likes'],
-                        comments=post_data['comments'],
-                        shares=post_data['shares'],
-                        post_url=post_data['post_url'],
-                        media_urls=post_data['media_urls']
-                    )
-                    self.db.add(post)
-            
-            self.db.commit()
-            self.log_message("INFO", f"Saved {len(posts_data)} posts to database")
+            inserted, skipped = bulk_insert_posts(self.db, self.job_id, posts_data, self.write_chunk_size)
+            self.log_message("INFO", f"Saved {inserted} posts to database ({skipped} duplicates skipped)")
+            return inserted
             
+        except SoftTimeLimitExceeded:
+            raise
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error saving posts to database: {str(e)}")
             self.log_message("ERROR", f"Error saving posts: {str(e)}")
+            return 0
     
     def log_message(self, level: str, message: str):
-        """Log message to database"""
+        """Queue a log message for the job's background log writer"""
         try:
-            log_entry = JobLog(
-                job_id=self.job_id,
-                level=level,
-                message=message
-            )
-            self.db.add(log_entry)
-            self.db.commit()
+            self.log_sink.log(level, message)
+        except SoftTimeLimitExceeded:
+            raise
         except Exception as e:
             logger.error(f"Failed to log message: {str(e)}")
     
-    def run_scraping_job(self):
-        """Main method to run the scraping job"""
+    def scrape_group_to_db(self, group_url: str, config: Dict, posts_scraped: int = 0) -> Tuple[int, int, int]:
+        """Scrape one group, streaming its posts to the database. Returns (inserted, skipped, posts scraped)."""
+        self.write_chunk_size = config.get('write_chunk_size', WRITE_CHUNK_SIZE)
+        writer = BufferedPostWriter(
+            self.db,
+            self.job_id,
+            flush_size=config.get('flush_every_posts', FLUSH_SIZE),
+            flush_interval=config.get('flush_interval_seconds', FLUSH_INTERVAL),
+            chunk_size=self.write_chunk_size
+        )
+        
+        if posts_scraped:
+            self.log_message("INFO", f"Resuming group: {group_url} ({posts_scraped} posts scraped before the pause)")
+        else:
+            self.log_message("INFO", f"Processing group: {group_url}")
+        try:
+            # Posts are written in small batches while the group is still scrolling
+            for post_data in self.scrape_group(group_url, config.get('max_posts_per_group', 50), config, posts_scraped):
+                writer.add(post_data)
+                posts_scraped += 1
+        finally:
+            # Keep whatever was scraped before a failure
+            writer.flush()
+        
+        return writer.inserted, writer.skipped, posts_scraped
+    
+    def scrape_groups_sequential(self, group_urls: List[str], config: Dict, checkpoint: Dict) -> Tuple[int, int]:
+        """Scrape groups one after another on a single driver"""
+        inserted = skipped = 0
+        self.setup_driver(config)
+        
+        for group_url in group_urls:
+            if self.stop_requested() or self.job_paused():
+                break
+            
+            group_inserted, group_skipped, posts_scraped = self.scrape_group_to_db(
+                group_url, config, checkpoint['group_posts'].get(group_url, 0)
+            )
+            inserted += group_inserted
+            skipped += group_skipped
+            self.record_progress(checkpoint, group_url, posts_scraped, not self.stopped)
+            
+            # Random delay between groups
+            if not self.stopped:
+                self.random_delay(5, 15)
+        
+        return inserted, skipped
+    
+    def scrape_groups_parallel(self, group_urls: List[str], config: Dict, max_parallel_groups: int,
+                               checkpoint: Dict) -> Tuple[int, int]:
+        """Fan groups out over threads, each with its own pooled driver and DB session"""
+        self.log_message("INFO", f"Scraping {len(group_urls)} groups with up to {max_parallel_groups} in parallel")
+        
+        def scrape_one(group_url: str) -> Tuple[int, int, int, bool]:
+            worker = FacebookGroupScraper(self.job_id, log_sink=self.log_sink, run_id=self.run_id,
+                                          known_posts=self.dedup.index)
+            try:
+                # Groups still waiting for a thread when a stop arrives never open a browser
+                if worker.stop_requested() or worker.job_paused():
+                    return 0, 0, checkpoint['group_posts'].get(group_url, 0), True
+                
+                # Siblings hold the other drivers for a whole group, so wait for one rather than time out
+                worker.setup_driver(config, checkout_timeout=None)
+                result = worker.scrape_group_to_db(group_url, config, checkpoint['group_posts'].get(group_url, 0))
+                
+                # Keep per-driver pacing before the driver goes back to the pool
+                if not worker.stopped:
+                    worker.random_delay(5, 15)
+                return result + (worker.stopped,)
+            finally:
+                worker.close()
+        
+        inserted = skipped = 0
+        with ThreadPoolExecutor(max_workers=max_parallel_groups, thread_name_prefix=f"job-{self.job_id}") as executor:
+            futures = {executor.submit(scrape_one, group_url): group_url for group_url in group_urls}
+            errors = []
+            try:
+                for future in as_completed(futures):
+                    try:
+                        group_inserted, group_skipped, posts_scraped, stopped = future.result()
+                    except Exception as e:
+                        # Wind the other groups down, but keep recording the progress they made
+                        if not errors:
+                            request_stop(self.job_id, self.run_id, reason="aborted")
+                        errors.append(e)
+                        continue
+                    inserted += group_inserted
+                    skipped += group_skipped
+                    self.stopped = self.stopped or stopped
+                    self.record_progress(checkpoint, futures[future], posts_scraped, not stopped)
+            except BaseException:
+                # Time limit: stop the threads before the pool waits for them
+                for future in futures:
+                    future.cancel()
+                request_stop(self.job_id, self.run_id, reason="aborted")
+                raise
+            
+            if errors:
+                raise errors[0]
+        
+        return inserted, skipped
+    
+    def record_progress(self, checkpoint: Dict, group_url: str, posts_scraped: int, finished: bool):
+        """Persist which groups are done and how far unfinished ones got, so a paused job can resume"""
+        if finished:
+            checkpoint['completed_groups'].append(group_url)
+            checkpoint['group_posts'].pop(group_url, None)
+        elif posts_scraped:
+            checkpoint['group_posts'][group_url] = posts_scraped
+        
+        # A fresh dict so the JSON column is seen as changed
+        self.db.query(Job).filter(Job.id == self.job_id).update(
+            {Job.checkpoint: dict(checkpoint)}, synchronize_session=False
+        )
+        self.db.commit()
+    
+    def close(self):
+        """Return the driver to the pool and release this scraper's resources"""
+        if self.driver:
+            get_driver_pool().checkin(self.driver, healthy=self.driver_healthy)
+            self.driver = None
+        self.governor.release_session()
+        if self.owns_log_sink:
+            self.log_sink.close()
+        self.db.close()
+    
+    def run_scraping_job(self, can_retry: bool = False):
+        """Main method to run the scraping job; errors are re-raised after the job status is updated"""
         try:
             # Get job details
             job = self.db.query(Job).filter(Job.id == self.job_id).first()
             if not job:
                 raise Exception(f"Job {self.job_id} not found")
             
+            self.run_id = job.run_id
+            
+            # Paused before a worker picked the task up
+            if self.stop_requested() or self.job_paused():
+                set_job_status(self.db, job, "paused")
+                self.db.commit()
+                self.log_message("INFO", "Job paused before it started")
+                return
+            
             # Update job status
-            job.status = "running"
+            set_job_status(self.db, job, "running")
             job.last_run = datetime.now()
             self.db.commit()
             
-            self.setup_driver()
-            
-            all_posts = []
             config = job.config or {}
-            max_posts_per_group = config.get('max_posts_per_group', 50)
-            
-            for group_url in job.group_urls:
-                self.log_message("INFO", f"Processing group: {group_url}")
-                posts = self.scrape_group(group_url, max_posts_per_group)
-                all_posts.extend(posts)
-                
-                # Random delay between groups
-                self.random_delay(5, 15)
+            group_urls = job.group_urls or []
             
-            # Save all posts to database
-            self.save_posts_to_db(all_posts)
+            # A paused job picks up after the groups it already finished
+            checkpoint = dict(job.checkpoint or {})
+            checkpoint = {
+                'completed_groups': list(checkpoint.get('completed_groups', [])),
+                'group_posts': dict(checkpoint.get('group_posts', {}))
+            }
+            remaining_urls = [url for url in group_urls if url not in checkpoint['completed_groups']]
+            if len(remaining_urls) < len(group_urls):
+                self.log_message("INFO", f"Resuming job: {len(group_urls) - len(remaining_urls)} of {len(group_urls)} groups already done")
+            
+            # Each group thread holds a driver from this process's pool, so more threads than drivers only queue
+            requested_parallel = int(config.get('max_parallel_groups', 1))
+            pool_size = get_driver_pool().max_size
+            if requested_parallel > pool_size:
+                self.log_message("WARNING", f"Scraping at most {pool_size} groups in parallel, the size of the driver pool "
+                                            f"({requested_parallel} requested)")
+            max_parallel_groups = min(requested_parallel, pool_size, len(remaining_urls))
+            
+            if max_parallel_groups > 1:
+                inserted, skipped = self.scrape_groups_parallel(remaining_urls, config, max_parallel_groups, checkpoint)
+            else:
+                inserted, skipped = self.scrape_groups_sequential(remaining_urls, config, checkpoint)
+            
+            # A pause that arrived only through the database still counts
+            self.db.refresh(job)
+            if self.stopped or job.status in STOPPED_STATUSES:
+                set_job_status(self.db, job, "paused")
+                self.db.commit()
+                self.log_message("INFO", f"Job paused. Posts saved this run: {inserted} ({skipped} duplicates skipped)")
+                return
             
             # Update job completion
-            job.status = "completed"
-            job.total_posts = len(all_posts)
+            set_job_status(self.db, job, "completed")
+            job.checkpoint = None
             self.db.commit()
             
-            self.log_message("INFO", f"Job completed successfully. Total posts scraped: {len(all_posts)}")
+            self.log_message("INFO", f"Job completed successfully. Total posts saved: {inserted} ({skipped} duplicates skipped)")
             
         except Exception as e:
-            logger.error(f"Job {self.job_id} failed: {str(e)}")
-            self.log_message("ERROR", f"Job failed: {str(e)}")
-            
-            # Update job status to failed
+            self.db.rollback()
             job = self.db.query(Job).filter(Job.id == self.job_id).first()
+            # A job the user stopped while it was failing is paused rather than retried
+            stopping = job is not None and job.status in STOPPED_STATUSES
+            # Waiting for a session slot is not a failure, so it does not need a retry left
+            retrying = not stopping and (isinstance(e, SessionSlotBusy) or can_retry and (
+                is_transient_driver_error(e) or isinstance(e, RateLimitTimeout)))
+            if isinstance(e, SoftTimeLimitExceeded):
+                message = "Job hit its time limit; start it again to resume from the checkpoint"
+            elif retrying and isinstance(e, SessionSlotBusy):
+                message = f"All browser session slots are busy, job requeued: {str(e)}"
+            elif retrying and isinstance(e, RateLimitTimeout):
+                message = f"Held back by rate limits, job will be retried: {str(e)}"
+            elif retrying:
+                message = f"Browser failure, job will be retried: {str(e)}"
+            else:
+                message = f"Job failed: {str(e)}"
+            logger.error(f"Job {self.job_id}: {message}")
+            self.log_message("WARNING" if retrying else "ERROR", message)
+            
+            # Update job status; a retried job keeps its checkpoint and waits in the queue
             if job:
-                job.status = "failed"
+                set_job_status(self.db, job, "paused" if stopping else "queued" if retrying else "failed")
+                if retrying:
+                    # The retry is a new run, so an "aborted" flag set while this one wound down does not stop it
+                    job.run_id = new_run_id()
                 self.db.commit()
+            
+            if stopping:
+                return
+            if retrying and not isinstance(e, (TransientDriverError, RateLimitTimeout)):
+                raise TransientDriverError(str(e)) from e
+            raise
                 
         finally:
-            if self.driver:
-                self.driver.quit()
-            self.db.close()
+            self.close()
 
-def run_scraping_job(job_id: int):
+def run_scraping_job(job_id: int, can_retry: bool = False):
     """Function to run scraping job - called by Celery task"""
     scraper = FacebookGroupScraper(job_id)
-    scraper.run_scraping_job()
+    scraper.run_scraping_job(can_retry)
 
@@ -0,0 +1,105 @@
+import time
+import random
+import logging
+from typing import Dict, Optional, Tuple
+from .extractor import ARTICLE_SELECTOR
+
+logger = logging.getLogger(__name__)
+
+# Returns (post count, document height, resource entries loaded so far, within a viewport of the bottom)
+MEASURE_SCRIPT = """
+if (!window.__fbsResourceBuffer) {
+    performance.setResourceTimingBufferSize(100000);
+    window.__fbsResourceBuffer = true;
+}
+return [
+    document.querySelectorAll(arguments[0]).length,
+    document.documentElement.scrollHeight,
+    performance.getEntriesByType('resource').length,
+    window.scrollY + 2 * window.innerHeight >= document.documentElement.scrollHeight
+];
+"""
+
+class ScrollController:
+    """Scrolls the feed and waits for new content instead of sleeping a fixed time"""
+
+    def __init__(self, driver, selector: str = ARTICLE_SELECTOR, timeout: float = 8.0,
+                 end_of_feed_scrolls: int = 3, network_idle: float = 1.5,
+                 jitter: Tuple[float, float] = (0.5, 1.5), poll_interval: float = 0.25):
+        self.driver = driver
+        self.selector = selector
+        self.timeout = timeout
+        self.end_of_feed_scrolls = end_of_feed_scrolls
+        self.network_idle = network_idle
+        self.jitter = jitter
+        self.poll_interval = poll_interval
+        self.idle_scrolls = 0
+
+    @classmethod
+    def from_config(cls, driver, config: Optional[Dict] = None) -> "ScrollController":
+        """Build a controller from a job's config"""
+        config = config or {}
+        return cls(
+            driver,
+            timeout=config.get('scroll_timeout', 8.0),
+            end_of_feed_scrolls=config.get('end_of_feed_scrolls', 3),
+            jitter=tuple(config.get('scroll_jitter', (0.5, 1.5)))
+        )
+
+    @property
+    def at_end(self) -> bool:
+        """True once several scrolls in a row loaded nothing"""
+        return self.idle_scrolls >= self.end_of_feed_scrolls
+
+    def measure(self) -> Tuple[int, int, int, bool]:
+        return tuple(self.driver.execute_script(MEASURE_SCRIPT, self.selector))
+
+    def wait_for_growth(self, before: Tuple[int, int, int, bool]) -> bool:
+        """Wait until posts or page height grow; give up on timeout or once the network goes quiet"""
+        count, height, resources, _ = before
+        deadline = time.monotonic() + self.timeout
+        quiet_since = time.monotonic()
+
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            now_count, now_height, now_resources, _ = self.measure()
+
+            if now_count > count or now_height != height:
+                return True
+
+            if now_resources != resources:
+                resources = now_resources
+                quiet_since = time.monotonic()
+            elif time.monotonic() - quiet_since >= self.network_idle:
+                return False
+
+        return False
+
+    def pause(self, scale: float = 1.0):
+        """Random pacing pause on top of the content wait"""
+        low, high = self.jitter
+        if high > 0:
+            time.sleep(random.uniform(low, high) * scale)
+
+    def scroll(self) -> bool:
+        """Scroll like a human and report whether new content arrived"""
+        before = self.measure()
+        self.driver.execute_script(f"window.scrollBy(0, {random.randint(300, 800)});")
+        after = self.measure()
+
+        # The feed only loads more near the bottom; elsewhere there is nothing to wait for
+        near_bottom = after[3]
+        grew = after[0] > before[0] or after[1] != before[1] or (near_bottom and self.wait_for_growth(before))
+
+        self.pause()
+
+        # Random chance to scroll back up a bit
+        if random.random() < 0.3:
+            self.driver.execute_script(f"window.scrollBy(0, -{random.randint(100, 300)});")
+            self.pause(0.5)
+
+        if grew:
+            self.idle_scrolls = 0
+        elif near_bottom:
+            self.idle_scrolls += 1
+        return grew
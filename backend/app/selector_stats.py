@@ -0,0 +1,99 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from .models import SelectorStat
+
+logger = logging.getLogger(__name__)
+
+# Weight kept by the previous score on each lookup; lower reacts faster to markup changes
+SCORE_DECAY = 0.9
+
+# Score assumed for selectors that have never been tried in a scope
+DEFAULT_SCORE = 0.5
+
+def group_scope(group_url: str) -> str:
+    """Key stats by host plus group path, e.g. www.facebook.com/groups/123"""
+    parsed = urlparse(group_url)
+    parts = [part for part in parsed.path.split('/') if part]
+    path = '/'.join(parts[:2]) if parts[:1] == ['groups'] else '/'.join(parts[:1])
+    return f"{parsed.netloc}/{path}".rstrip('/')
+
+class SelectorScope:
+    """Hit/miss statistics for one group, used to try the likeliest selectors first"""
+
+    def __init__(self, scope: str, stats: Dict[Tuple[str, str], Dict]):
+        self.scope = scope
+        self.stats = stats
+        self.dirty = set()
+
+    def ordered(self, kind: str, selectors: List[str]) -> List[str]:
+        """Selectors sorted by recent success, falling back to their default order"""
+        return sorted(
+            selectors,
+            key=lambda selector: (
+                -self.stats.get((kind, selector), {}).get('score', DEFAULT_SCORE),
+                selectors.index(selector)
+            )
+        )
+
+    def record(self, kind: str, selector: str, hit: bool):
+        stat = self.stats.setdefault((kind, selector), {
+            'hits': 0, 'misses': 0, 'score': DEFAULT_SCORE, 'last_hit': None
+        })
+        if hit:
+            stat['hits'] += 1
+            stat['last_hit'] = datetime.now()
+        else:
+            stat['misses'] += 1
+        stat['score'] = stat['score'] * SCORE_DECAY + (1.0 - SCORE_DECAY) * hit
+        self.dirty.add((kind, selector))
+
+class SelectorRegistry:
+    """Loads and persists per-group selector statistics in the selector_stats table"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def scope(self, group_url: str) -> SelectorScope:
+        scope = group_scope(group_url)
+        rows = self.db.query(SelectorStat).filter(SelectorStat.scope == scope).all()
+        stats = {
+            (row.kind, row.selector): {
+                'hits': row.hits or 0,
+                'misses': row.misses or 0,
+                'score': row.score if row.score is not None else DEFAULT_SCORE,
+                'last_hit': row.last_hit
+            }
+            for row in rows
+        }
+        return SelectorScope(scope, stats)
+
+    def save(self, selector_scope: SelectorScope):
+        """Write back the stats that changed during this run"""
+        if not selector_scope.dirty:
+            return
+
+        try:
+            rows = {
+                (row.kind, row.selector): row
+                for row in self.db.query(SelectorStat).filter(SelectorStat.scope == selector_scope.scope).all()
+            }
+            for key in selector_scope.dirty:
+                stat = selector_scope.stats[key]
+                row = rows.get(key)
+                if row is None:
+                    row = SelectorStat(scope=selector_scope.scope, kind=key[0], selector=key[1])
+                    self.db.add(row)
+                row.hits = stat['hits']
+                row.misses = stat['misses']
+                row.score = stat['score']
+                row.last_hit = stat['last_hit']
+            self.db.commit()
+            selector_scope.dirty.clear()
+        except SQLAlchemyError as e:
+            # Another worker saved the same scope first; these stats are best-effort
+            self.db.rollback()
+            logger.warning(f"Could not save selector stats for {selector_scope.scope}: {str(e)}")
@@ -0,0 +1,176 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from decouple import config
+from .models import User, Job, Post, UserStat, GroupStat
+
+logger = logging.getLogger(__name__)
+
+# How often the counters are recomputed from the posts and jobs tables
+STATS_RECONCILE_SECONDS = config('STATS_RECONCILE_SECONDS', default=3600, cast=int)
+
+# Statuses counted as active jobs on the dashboard
+ACTIVE_JOB_STATUSES = ('running',)
+
+def adjust_user_stats(db: Session, user_id: int, jobs: int = 0, active: int = 0, posts: int = 0):
+    """Apply counter deltas to a user's stats row; the caller commits"""
+    if not (jobs or active or posts):
+        return
+    db.query(UserStat).filter(UserStat.user_id == user_id).update(
+        {
+            UserStat.total_jobs: UserStat.total_jobs + jobs,
+            UserStat.active_jobs: UserStat.active_jobs + active,
+            UserStat.total_posts: UserStat.total_posts + posts,
+        },
+        synchronize_session=False
+    )
+
+def set_job_status(db: Session, job: Job, status: str):
+    """Change a job's status, keeping its owner's active-job counter in step; the caller commits"""
+    delta = int(status in ACTIVE_JOB_STATUSES) - int(job.status in ACTIVE_JOB_STATUSES)
+    job.status = status
+    if delta and job.user_id:
+        adjust_user_stats(db, job.user_id, active=delta)
+
+def job_created(db: Session, job: Job):
+    adjust_user_stats(db, job.user_id, jobs=1, active=int(job.status in ACTIVE_JOB_STATUSES))
+
+def job_deleted(db: Session, job: Job):
+    """Take a deleted job's posts and counts off its owner's totals and drop its group stats"""
+    adjust_user_stats(db, job.user_id, jobs=-1, active=-int(job.status in ACTIVE_JOB_STATUSES),
+                      posts=-(job.total_posts or 0))
+    db.query(GroupStat).filter(GroupStat.job_id == job.id).delete(synchronize_session=False)
+
+def reconcile_job_stats(db: Session, job_id: int) -> int:
+    """Recompute a job's post total and per-group stats from the posts table; returns how many were off"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        return 0
+
+    group_name = func.coalesce(Post.group_name, '')
+    actual = {
+        name: (count, last_scraped_at)
+        for name, count, last_scraped_at in db.query(group_name, func.count(Post.id), func.max(Post.scraped_at))
+        .filter(Post.job_id == job_id)
+        .group_by(group_name)
+    }
+    stored = {stat.group_name: stat for stat in db.query(GroupStat).filter(GroupStat.job_id == job_id)}
+
+    corrections = 0
+    for name, (count, last_scraped_at) in actual.items():
+        stat = stored.pop(name, None)
+        if stat is None:
+            db.add(GroupStat(job_id=job_id, group_name=name, post_count=count, last_scraped_at=last_scraped_at))
+            corrections += 1
+        elif (stat.post_count, stat.last_scraped_at) != (count, last_scraped_at):
+            stat.post_count = count
+            stat.last_scraped_at = last_scraped_at
+            corrections += 1
+    for stat in stored.values():
+        db.delete(stat)
+        corrections += 1
+
+    total_posts = sum(count for count, _ in actual.values())
+    if job.total_posts != total_posts:
+        logger.info(f"Job {job_id}: post counter corrected from {job.total_posts} to {total_posts}")
+        adjust_user_stats(db, job.user_id, posts=total_posts - (job.total_posts or 0))
+        job.total_posts = total_posts
+        corrections += 1
+
+    db.commit()
+    return corrections
+
+def reconcile_user_stats(db: Session, user_id: int) -> UserStat:
+    """Recompute a user's stats row from the jobs table and the reconciled per-job totals"""
+    total_jobs, active_jobs, total_posts = db.query(
+        func.count(Job.id),
+        func.count(Job.id).filter(Job.status.in_(ACTIVE_JOB_STATUSES)),
+        func.coalesce(func.sum(Job.total_posts), 0)
+    ).filter(Job.user_id == user_id).one()
+    last_scraped_at = db.query(func.max(GroupStat.last_scraped_at)).join(Job, GroupStat.job_id == Job.id).filter(
+        Job.user_id == user_id
+    ).scalar()
+
+    values = {
+        'total_jobs': total_jobs,
+        'active_jobs': active_jobs,
+        'total_posts': total_posts,
+        'last_scraped_at': last_scraped_at,
+        'reconciled_at': datetime.now(),
+    }
+    stat = db.query(UserStat).filter(UserStat.user_id == user_id).first()
+    if stat is None:
+        stat = UserStat(user_id=user_id, **values)
+        db.add(stat)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another request created the row first
+            db.rollback()
+            stat = db.query(UserStat).filter(UserStat.user_id == user_id).one()
+        return stat
+
+    if (stat.total_jobs, stat.active_jobs, stat.total_posts) != (total_jobs, active_jobs, total_posts):
+        logger.info(f"User {user_id}: stats corrected from "
+                    f"{stat.total_jobs}/{stat.active_jobs}/{stat.total_posts} to {total_jobs}/{active_jobs}/{total_posts}")
+    for key, value in values.items():
+        setattr(stat, key, value)
+    db.commit()
+    return stat
+
+def reconcile_all_stats(db: Session) -> Dict[str, int]:
+    """Correct drift in every job's and user's counters, one job per transaction"""
+    corrections = 0
+    job_ids = [job_id for (job_id,) in db.query(Job.id).order_by(Job.id)]
+    for job_id in job_ids:
+        corrections += reconcile_job_stats(db, job_id)
+
+    user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+    for user_id in user_ids:
+        reconcile_user_stats(db, user_id)
+
+    return {"jobs": len(job_ids), "users": len(user_ids), "job_corrections": corrections}
+
+def _latest(timestamps) -> Optional[datetime]:
+    return max((timestamp for timestamp in timestamps if timestamp), default=None)
+
+def load_user_stats(db: Session, user: User) -> Dict:
+    """Dashboard stats from the counter tables, without touching the posts table"""
+    stat = db.query(UserStat).filter(UserStat.user_id == user.id).first()
+    if stat is None:
+        # First read for this user: count once, then the writer and status changes keep it current
+        stat = reconcile_user_stats(db, user.id)
+
+    jobs = db.query(Job.id, Job.name, Job.status, Job.total_posts).filter(Job.user_id == user.id).order_by(Job.id).all()
+    groups: Dict[int, List[Dict]] = {job.id: [] for job in jobs}
+    group_stats = db.query(GroupStat).join(Job, GroupStat.job_id == Job.id).filter(
+        Job.user_id == user.id
+    ).order_by(GroupStat.job_id, GroupStat.group_name)
+    for group in group_stats:
+        groups[group.job_id].append({
+            "group_name": group.group_name,
+            "post_count": group.post_count,
+            "last_scraped_at": group.last_scraped_at,
+        })
+
+    return {
+        "total_jobs": stat.total_jobs,
+        "total_posts": stat.total_posts,
+        "active_jobs": stat.active_jobs,
+        "last_scraped_at": stat.last_scraped_at,
+        "user_tier": user.user_tier,
+        "jobs": [
+            {
+                "job_id": job.id,
+                "name": job.name,
+                "status": job.status,
+                "total_posts": job.total_posts or 0,
+                "last_scraped_at": _latest(group["last_scraped_at"] for group in groups[job.id]),
+                "groups": groups[job.id],
+            }
+            for job in jobs
+        ],
+    }
@@ -1,10 +1,34 @@
 from celery import Celery
+from celery.signals import worker_process_shutdown
 from decouple import config
 from .scraper import run_scraping_job
+from .driver_pool import close_driver_pool, TransientDriverError
+from .ratelimit import RateLimitTimeout, SessionSlotBusy
+from .database import SessionLocal
+from .models import Job, JobLog
+from .scheduler import dispatch_due_jobs, SCHEDULER_TICK_SECONDS
+from .artifacts import build_export_artifact, EXPORT_TIME_LIMIT
+from .stats import reconcile_job_stats, reconcile_all_stats, STATS_RECONCILE_SECONDS
 
 # Celery configuration
 REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 
+# Prefork child processes each get their own driver pool, so one scrape per process keeps a worker at
+# DRIVER_POOL_SIZE browsers (used by that scrape's parallel groups); scale out with more worker processes
+WORKER_CONCURRENCY = config('WORKER_CONCURRENCY', default=1, cast=int)
+
+# A scrape past the soft limit stops, checkpoints and returns its browser; the hard limit kills it after a grace period
+SCRAPE_SOFT_TIME_LIMIT = config('SCRAPE_SOFT_TIME_LIMIT', default=3 * 3600, cast=int)
+SCRAPE_HARD_TIME_LIMIT = SCRAPE_SOFT_TIME_LIMIT + config('SCRAPE_TIME_LIMIT_GRACE', default=300, cast=int)
+
+# Retries after browser crashes, backing off exponentially up to the maximum delay
+SCRAPE_MAX_RETRIES = config('SCRAPE_MAX_RETRIES', default=3, cast=int)
+SCRAPE_RETRY_BACKOFF = config('SCRAPE_RETRY_BACKOFF', default=60, cast=int)
+SCRAPE_RETRY_BACKOFF_MAX = config('SCRAPE_RETRY_BACKOFF_MAX', default=1800, cast=int)
+
+# A job that found every browser-session slot taken goes back on the queue after this long
+SESSION_REQUEUE_DELAY = config('SESSION_REQUEUE_DELAY', default=60, cast=int)
+
 celery_app = Celery(
     'facebook_scraper',
     broker=REDIS_URL,
@@ -18,17 +42,117 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    worker_concurrency=WORKER_CONCURRENCY,
+    # Browser tasks run for a long time; each worker reserves only the task it is running
+    worker_prefetch_multiplier=1,
+    # Acknowledge after the run so a crashed worker's job is redelivered, not lost
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Redis redelivers unacknowledged tasks after this long, so it must outlast any run or retry delay
+    broker_transport_options={'visibility_timeout': SCRAPE_HARD_TIME_LIMIT + SCRAPE_RETRY_BACKOFF_MAX + 600},
     task_routes={
         'app.tasks.scrape_facebook_group': {'queue': 'scraping'},
+        # Short database-only work stays off the browser workers
+        'app.tasks.finalize_scraping_job': {'queue': 'processing'},
+        'app.tasks.dispatch_scheduled_jobs': {'queue': 'processing'},
+        'app.tasks.reconcile_stats': {'queue': 'processing'},
+        # Exports can read every post of a job, so they queue separately from the short processing tasks
+        'app.tasks.build_export': {'queue': 'exports'},
+    },
+    beat_schedule={
+        'dispatch-scheduled-jobs': {
+            'task': 'app.tasks.dispatch_scheduled_jobs',
+            'schedule': SCHEDULER_TICK_SECONDS,
+        },
+        'reconcile-stats': {
+            'task': 'app.tasks.reconcile_stats',
+            'schedule': STATS_RECONCILE_SECONDS,
+        },
     }
 )
 
-@celery_app.task(name='app.tasks.scrape_facebook_group')
-def scrape_facebook_group(job_id: int):
+@celery_app.task(
+    bind=True,
+    name='app.tasks.scrape_facebook_group',
+    soft_time_limit=SCRAPE_SOFT_TIME_LIMIT,
+    time_limit=SCRAPE_HARD_TIME_LIMIT,
+    autoretry_for=(TransientDriverError, RateLimitTimeout),
+    max_retries=SCRAPE_MAX_RETRIES,
+    retry_backoff=SCRAPE_RETRY_BACKOFF,
+    retry_backoff_max=SCRAPE_RETRY_BACKOFF_MAX,
+    retry_jitter=True
+)
+def scrape_facebook_group(self, job_id: int):
     """Celery task to scrape Facebook group"""
     try:
-        run_scraping_job(job_id)
-        return {"status": "success", "job_id": job_id}
+        run_scraping_job(job_id, can_retry=self.request.retries < self.max_retries)
+    except SessionSlotBusy:
+        # Queued behind other jobs rather than failed: requeued with the retry count it already had
+        self.apply_async((job_id,), countdown=SESSION_REQUEUE_DELAY, retries=self.request.retries)
+        return {"status": "requeued", "job_id": job_id}
+    except (TransientDriverError, RateLimitTimeout) as e:
+        if self.request.retries < self.max_retries:
+            # Retried from the job's checkpoint on whichever worker picks it up
+            raise
+        return {"status": "error", "job_id": job_id, "error": str(e)}
     except Exception as e:
         return {"status": "error", "job_id": job_id, "error": str(e)}
+    
+    finalize_scraping_job.delay(job_id)
+    return {"status": "success", "job_id": job_id}
+
+@celery_app.task(name='app.tasks.finalize_scraping_job')
+def finalize_scraping_job(job_id: int):
+    """Post-processing after a run: reconcile the job's post and group counters with the posts table"""
+    db = SessionLocal()
+    try:
+        counted = db.query(Job.total_posts).filter(Job.id == job_id).scalar()
+        reconcile_job_stats(db, job_id)
+        stored = db.query(Job.total_posts).filter(Job.id == job_id).scalar()
+        if counted != stored:
+            db.add(JobLog(job_id=job_id, level="INFO",
+                          message=f"Post counter corrected from {counted} to {stored}"))
+            db.commit()
+        return {"status": "success", "job_id": job_id, "total_posts": stored}
+    finally:
+        db.close()
+
+@celery_app.task(name='app.tasks.dispatch_scheduled_jobs')
+def dispatch_scheduled_jobs():
+    """Beat task that queues scheduled jobs whose next run is due"""
+    db = SessionLocal()
+    try:
+        dispatched = dispatch_due_jobs(db, scrape_facebook_group.delay)
+        return {"status": "success", "dispatched": dispatched}
+    finally:
+        db.close()
+
+@celery_app.task(name='app.tasks.build_export', soft_time_limit=EXPORT_TIME_LIMIT, time_limit=EXPORT_TIME_LIMIT + 60)
+def build_export(export_id: int):
+    """Write a requested export to the artifact store"""
+    db = SessionLocal()
+    try:
+        export = build_export_artifact(db, export_id)
+        if not export:
+            return {"status": "error", "export_id": export_id, "error": "Export not found"}
+        if export.status == "failed":
+            return {"status": "error", "export_id": export_id, "error": export.error}
+        return {"status": "success", "export_id": export_id, "size_bytes": export.size_bytes}
+    finally:
+        db.close()
+
+@celery_app.task(name='app.tasks.reconcile_stats')
+def reconcile_stats():
+    """Beat task that recomputes the dashboard counters to correct any drift"""
+    db = SessionLocal()
+    try:
+        result = reconcile_all_stats(db)
+        return {"status": "success", **result}
+    finally:
+        db.close()
+
 
+@worker_process_shutdown.connect
+def close_browser_pool(**kwargs):
+    """Quit the worker process's pooled browsers on shutdown"""
+    close_driver_pool()
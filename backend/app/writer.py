@@ -0,0 +1,159 @@
+import time
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from sqlalchemy.dialects import postgresql, sqlite
+from decouple import config
+from .models import Job, Post, UserStat, GroupStat
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement
+WRITE_CHUNK_SIZE = config('POST_WRITE_CHUNK_SIZE', default=500, cast=int)
+
+# Streaming writer flushes after this many posts or seconds, whichever comes first
+FLUSH_SIZE = config('POST_FLUSH_SIZE', default=50, cast=int)
+FLUSH_INTERVAL = config('POST_FLUSH_INTERVAL', default=30.0, cast=float)
+
+POST_FIELDS = [
+    'post_id', 'group_name', 'author_name', 'author_url', 'content', 'timestamp',
+    'likes', 'comments', 'shares', 'post_url', 'content_hash', 'media_urls'
+]
+
+INSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+def post_mapping(job_id: int, post_data: Dict, scraped_at: datetime) -> Dict:
+    """Build a posts row from a scraped post dict"""
+    mapping = {field: post_data.get(field) for field in POST_FIELDS}
+    mapping['job_id'] = job_id
+    # Set here rather than by the database default so pagination cursors compare exactly on every backend
+    mapping['scraped_at'] = scraped_at
+    return mapping
+
+def _insert_chunk(db: Session, rows: List[Dict]) -> List[Dict]:
+    """Insert one chunk, skipping post_ids that already exist, and return the rows inserted"""
+    dialect_insert = INSERT_DIALECTS.get(db.get_bind().dialect.name)
+
+    if dialect_insert is not None:
+        # The unique constraint on post_id resolves races between workers inside the database
+        stmt = (
+            dialect_insert(Post.__table__)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=['post_id'])
+            .returning(Post.__table__.c.post_id)
+        )
+        inserted_ids = {row[0] for row in db.execute(stmt).all()}
+        return [row for row in rows if row['post_id'] in inserted_ids]
+
+    # Other backends: one existence check per chunk, then a bulk insert
+    post_ids = [row['post_id'] for row in rows]
+    existing = {row[0] for row in db.query(Post.post_id).filter(Post.post_id.in_(post_ids)).all()}
+    fresh = [row for row in rows if row['post_id'] not in existing]
+    db.bulk_insert_mappings(Post, fresh)
+    return fresh
+
+def _upsert_group_stat(db: Session, job_id: int, group_name: str, count: int, scraped_at: datetime):
+    dialect_insert = INSERT_DIALECTS.get(db.get_bind().dialect.name)
+
+    if dialect_insert is not None:
+        stmt = dialect_insert(GroupStat.__table__).values(
+            job_id=job_id, group_name=group_name, post_count=count, last_scraped_at=scraped_at
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=['job_id', 'group_name'],
+            set_={'post_count': GroupStat.__table__.c.post_count + stmt.excluded.post_count,
+                  'last_scraped_at': stmt.excluded.last_scraped_at}
+        ))
+        return
+
+    updated = db.query(GroupStat).filter(GroupStat.job_id == job_id, GroupStat.group_name == group_name).update(
+        {GroupStat.post_count: GroupStat.post_count + count, GroupStat.last_scraped_at: scraped_at},
+        synchronize_session=False
+    )
+    if not updated:
+        db.add(GroupStat(job_id=job_id, group_name=group_name, post_count=count, last_scraped_at=scraped_at))
+
+def _bump_counters(db: Session, job_id: int, rows: List[Dict]):
+    """Add freshly inserted posts to the job, user and per-group counters in the insert's transaction"""
+    scraped_at = max(row['scraped_at'] for row in rows)
+    db.query(Job).filter(Job.id == job_id).update(
+        {Job.total_posts: func.coalesce(Job.total_posts, 0) + len(rows)},
+        synchronize_session=False
+    )
+    # A user without a stats row yet gets one, counted from scratch, the first time stats are read
+    db.query(UserStat).filter(
+        UserStat.user_id == select(Job.user_id).where(Job.id == job_id).scalar_subquery()
+    ).update(
+        {UserStat.total_posts: UserStat.total_posts + len(rows), UserStat.last_scraped_at: scraped_at},
+        synchronize_session=False
+    )
+    for group_name, count in Counter(row['group_name'] or '' for row in rows).items():
+        _upsert_group_stat(db, job_id, group_name, count, scraped_at)
+
+def bulk_insert_posts(db: Session, job_id: int, posts_data: List[Dict], chunk_size: int = WRITE_CHUNK_SIZE) -> Tuple[int, int]:
+    """Insert scraped posts in chunks, committing each one with its counter updates. Returns (inserted, skipped)."""
+    rows = []
+    seen = set()
+    scraped_at = datetime.now()
+    for post_data in posts_data:
+        # Duplicates inside one statement would conflict with each other on PostgreSQL
+        if not post_data.get('post_id') or post_data['post_id'] in seen:
+            continue
+        seen.add(post_data['post_id'])
+        rows.append(post_mapping(job_id, post_data, scraped_at))
+
+    inserted = 0
+    for start in range(0, len(rows), chunk_size):
+        try:
+            fresh = _insert_chunk(db, rows[start:start + chunk_size])
+            if fresh:
+                _bump_counters(db, job_id, fresh)
+            db.commit()
+            inserted += len(fresh)
+        except Exception:
+            db.rollback()
+            raise
+
+    return inserted, len(posts_data) - inserted
+
+class BufferedPostWriter:
+    """Buffers streamed posts and bulk-inserts them every N posts or T seconds"""
+
+    def __init__(self, db: Session, job_id: int, flush_size: int = FLUSH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, chunk_size: int = WRITE_CHUNK_SIZE):
+        self.db = db
+        self.job_id = job_id
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.chunk_size = chunk_size
+        self.buffer: List[Dict] = []
+        self.inserted = 0
+        self.skipped = 0
+        self.last_flush = time.monotonic()
+
+    def add(self, post_data: Dict):
+        """Queue a post, flushing when the buffer is full or stale"""
+        self.buffer.append(post_data)
+        if len(self.buffer) >= self.flush_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write buffered posts; the counters are bumped as each chunk is inserted"""
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return 0
+
+        posts_data, self.buffer = self.buffer, []
+        inserted, skipped = bulk_insert_posts(self.db, self.job_id, posts_data, self.chunk_size)
+
+        self.inserted += inserted
+        self.skipped += skipped
+        logger.info(f"Job {self.job_id}: flushed {inserted} posts ({skipped} skipped)")
+        return inserted
@@ -0,0 +1,170 @@
+"""Offline extraction benchmark over saved feed snapshots.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_extraction [fixtures...] [--repeat 5] [--json out.json] [--min-posts-per-sec N]
+
+*.html files are saved driver.page_source snapshots and go through app.extractor;
+*.txt / *.json files are recorded GraphQL feed responses and go through app.capture.
+"""
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, List
+from app import extractor
+from app.capture import parse_feed_payload
+from app.metrics import extract_metrics
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+FIELD_EXTRACTORS = {
+    'author': extractor.extract_author,
+    'content': extractor.extract_content,
+    'metrics': extractor.extract_metrics,
+}
+
+def measure_memory(func, *args) -> int:
+    """Peak bytes allocated while running func"""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def selector_hit_rates(soup, articles: List) -> Dict[str, Dict[str, float]]:
+    """Fraction of pages / posts each selector matches"""
+    rates = {'group_name': {}, 'author': {}, 'content': {}, 'metrics': {}}
+    total = len(articles) or 1
+
+    for selector in extractor.GROUP_NAME_SELECTORS:
+        element = soup.select_one(selector)
+        rates['group_name'][selector] = float(element is not None and bool(element.get_text(strip=True)))
+
+    rates['author'][extractor.AUTHOR_SELECTOR] = sum(
+        article.select_one(extractor.AUTHOR_SELECTOR) is not None for article in articles
+    ) / total
+
+    for selector in extractor.CONTENT_SELECTORS:
+        rates['content'][selector] = sum(
+            article.select_one(selector) is not None for article in articles
+        ) / total
+
+    for field in ('likes', 'comments', 'shares'):
+        rates['metrics'][field] = sum(
+            extract_metrics(article)[field] > 0 for article in articles
+        ) / total
+
+    return rates
+
+def bench_html(path: Path, repeat: int) -> Dict:
+    page_source = path.read_text(encoding='utf-8')
+    timings = defaultdict(float)
+    posts = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        soup = extractor.parse_page(page_source)
+        timings['parse'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        group_name = extractor.extract_group_name(soup)
+        timings['group_name'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        articles = extractor.find_articles(soup)
+        timings['find_articles'] += time.perf_counter() - start
+
+        for article in articles:
+            for field, extract in FIELD_EXTRACTORS.items():
+                start = time.perf_counter()
+                extract(article)
+                timings[field] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            if extractor.extract_post_data(article, group_name, str(path)):
+                posts += 1
+            timings['extract_post_data'] += time.perf_counter() - start
+
+    # Field timings are a breakdown of extract_post_data, so they are not added twice
+    elapsed = timings['parse'] + timings['group_name'] + timings['find_articles'] + timings['extract_post_data']
+
+    return {
+        'fixture': path.name,
+        'kind': 'html',
+        'posts': posts // repeat,
+        'posts_per_sec': posts / elapsed if elapsed else 0.0,
+        'timings_ms': {name: value * 1000 / repeat for name, value in timings.items()},
+        'selector_hit_rates': selector_hit_rates(soup, articles),
+        'peak_memory_kb': measure_memory(extractor.extract_feed, page_source, group_name, str(path)) / 1024,
+    }
+
+def bench_graphql(path: Path, repeat: int) -> Dict:
+    body = path.read_text(encoding='utf-8')
+    posts = 0
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        posts += len(parse_feed_payload(body, 'Benchmark Group', str(path)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'fixture': path.name,
+        'kind': 'graphql',
+        'posts': posts // repeat,
+        'posts_per_sec': posts / elapsed if elapsed else 0.0,
+        'timings_ms': {'parse_feed_payload': elapsed * 1000 / repeat},
+        'peak_memory_kb': measure_memory(parse_feed_payload, body, 'Benchmark Group', str(path)) / 1024,
+    }
+
+def collect_fixtures(paths: List[str]) -> List[Path]:
+    fixtures = []
+    for raw in paths or [str(FIXTURES_DIR)]:
+        path = Path(raw)
+        if path.is_dir():
+            fixtures.extend(sorted(p for p in path.iterdir() if p.suffix in ('.html', '.txt', '.json')))
+        else:
+            fixtures.append(path)
+    return fixtures
+
+def print_report(results: List[Dict]):
+    for result in results:
+        print(f"\n{result['fixture']} ({result['kind']}): {result['posts']} posts, "
+              f"{result['posts_per_sec']:.0f} posts/sec, peak {result['peak_memory_kb']:.0f} KB")
+        for name, value in result['timings_ms'].items():
+            print(f"  {name:<20} {value:8.2f} ms")
+        for group, rates in result.get('selector_hit_rates', {}).items():
+            for selector, rate in rates.items():
+                print(f"  hit {group:<10} {rate:6.1%}  {selector}")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark post extraction against saved feed snapshots")
+    parser.add_argument('paths', nargs='*', help="fixture files or directories (default: benchmarks/fixtures)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', dest='json_path', help="also write results as JSON")
+    parser.add_argument('--min-posts-per-sec', type=float, default=0.0,
+                        help="exit non-zero if any fixture is slower than this")
+    args = parser.parse_args(argv)
+
+    results = []
+    for path in collect_fixtures(args.paths):
+        bench = bench_html if path.suffix == '.html' else bench_graphql
+        results.append(bench(path, args.repeat))
+
+    print_report(results)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+    slow = [r['fixture'] for r in results if r['posts_per_sec'] < args.min_posts_per_sec]
+    if slow:
+        print(f"\nBelow {args.min_posts_per_sec:.0f} posts/sec: {', '.join(slow)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Microbenchmark for engagement-metric parsing.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_metrics [--repeat 2000] [--min-labels-per-sec N]
+"""
+import sys
+import time
+import argparse
+from app import extractor
+from app.metrics import label_counts, extract_metrics
+from benchmarks.bench_extraction import FIXTURES_DIR
+
+LABELS = [
+    'Like: 12 people',
+    'See who reacted to this: 1.2K reactions, including like',
+    '3,5K reactions',
+    '1,234 comments',
+    '1.234 Kommentare',
+    '1 234 shares',
+    '2M views',
+    'Leave a comment',
+    'Like',
+    'Send this to friends or post it on your profile.',
+    '12 reactions, 3 comments, 1 share',
+]
+
+def bench_labels(repeat: int) -> float:
+    """Labels turned into counters per second, through the same call extract_metrics makes"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for label in LABELS:
+            label_counts(label)
+    return repeat * len(LABELS) / (time.perf_counter() - start)
+
+def bench_articles(repeat: int) -> float:
+    """Posts whose metrics are extracted per second, from the HTML fixture"""
+    soup = extractor.parse_page((FIXTURES_DIR / 'group_feed.html').read_text(encoding='utf-8'))
+    articles = extractor.find_articles(soup)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for article in articles:
+            extract_metrics(article)
+    return repeat * len(articles) / (time.perf_counter() - start)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark engagement-metric parsing")
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--min-labels-per-sec', type=float, default=0.0,
+                        help="exit non-zero if label parsing is slower than this")
+    args = parser.parse_args(argv)
+
+    labels_per_sec = bench_labels(args.repeat)
+    posts_per_sec = bench_articles(max(args.repeat // 100, 1))
+    print(f"labels: {labels_per_sec:,.0f}/sec")
+    print(f"posts:  {posts_per_sec:,.0f}/sec (single pass over aria-labels)")
+
+    if labels_per_sec < args.min_labels_per_sec:
+        print(f"Below {args.min_labels_per_sec:,.0f} labels/sec")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -127,6 +127,7 @@ def main_app():
                             'running': '🟢',
                             'completed': '🔵',
                             'failed': '🔴',
+                            'stopping': '🟡',
                             'paused': '🟡',
                             'created': '⚪'
                         }.get(job['status'], '⚪')
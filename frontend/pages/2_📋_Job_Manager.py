@@ -2,6 +2,7 @@ import streamlit as st
 from utils.helpers import require_authentication, validate_facebook_url, get_status_color
 from utils.api_client import APIClient
 from datetime import datetime
+from decouple import config
 import time
 
 # Require authentication
@@ -12,6 +13,9 @@ st.set_page_config(page_title="Job Manager", page_icon="📋", layout="wide")
 # Initialize API client
 api_client = APIClient()
 
+# Each parallel group holds one of the scraper's pooled browsers, so this matches the workers' DRIVER_POOL_SIZE
+MAX_PARALLEL_GROUPS = config('DRIVER_POOL_SIZE', default=2, cast=int)
+
 st.title("📋 Job Manager")
 
 # Tabs for different job management functions
@@ -37,9 +41,14 @@ with tab1:
         
         with col1:
             max_posts = st.number_input("Max Posts per Group", min_value=10, max_value=1000, value=50)
+            schedule_cron = st.text_input("Repeat Schedule (cron, optional)", placeholder="0 */6 * * *",
+                                          help="Leave empty to run the job only when started manually")
         
         with col2:
             extract_comments = st.checkbox("Extract Comments", value=True)
+            max_parallel_groups = st.number_input("Groups Scraped in Parallel", min_value=1, max_value=MAX_PARALLEL_GROUPS, value=1)
+            incremental = st.checkbox("Only New Posts", value=False,
+                                      help="Stop scrolling a group once it reaches posts scraped by earlier runs")
         
         submit_btn = st.form_submit_button("Create Job", use_container_width=True)
         
@@ -58,8 +67,12 @@ with tab1:
                     try:
                         config = {
                             "max_posts_per_group": max_posts,
-                            "extract_comments": extract_comments
+                            "extract_comments": extract_comments,
+                            "max_parallel_groups": max_parallel_groups,
+                            "incremental": incremental
                         }
+                        if schedule_cron.strip():
+                            config["schedule"] = {"cron": schedule_cron.strip()}
                         
                         with st.spinner("Creating job..."):
                             result = api_client.create_job(job_name, group_urls, config)
@@ -94,6 +107,7 @@ with tab2:
                             'running': '🟢 Running',
                             'completed': '🔵 Completed',
                             'failed': '🔴 Failed',
+                            'stopping': '🟡 Stopping',
                             'paused': '🟡 Paused',
                             'created': '⚪ Created'
                         }
@@ -178,6 +192,9 @@ with tab3:
                 
                 if job['last_run']:
                     st.write(f"**Last Run:** {datetime.fromisoformat(job['last_run'].replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')}")
+                
+                if job.get('next_run_at'):
+                    st.write(f"**Next Run:** {datetime.fromisoformat(job['next_run_at'].replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')}")
             
             with col2:
                 st.write("**Configuration**")
@@ -79,8 +79,14 @@ class APIClient:
         response = requests.delete(f"{self.base_url}/jobs/{job_id}", headers=self._get_headers())
         return self._handle_response(response)
     
-    def get_job_posts(self, job_id: int, skip: int = 0, limit: int = 100) -> List[Dict]:
-        params = {"skip": skip, "limit": limit}
+    def get_job_posts(self, job_id: int, cursor: Optional[str] = None, limit: int = 100,
+                      group_name: Optional[str] = None, author: Optional[str] = None,
+                      scraped_from: Optional[str] = None, scraped_to: Optional[str] = None) -> Dict:
+        params = {"limit": limit}
+        for key, value in (("cursor", cursor), ("group_name", group_name), ("author", author),
+                           ("scraped_from", scraped_from), ("scraped_to", scraped_to)):
+            if value:
+                params[key] = value
         response = requests.get(
             f"{self.base_url}/data/jobs/{job_id}/posts", 
             params=params, 
@@ -96,12 +102,29 @@ class APIClient:
         response = requests.get(f"{self.base_url}/data/stats", headers=self._get_headers())
         return self._handle_response(response)
     
-    def export_job_data(self, job_id: int, format: str = 'csv') -> bytes:
+    def export_job_data(self, job_id: int, format: str = 'csv', columns: Optional[List[str]] = None) -> bytes:
+        params = {"columns": ",".join(columns)} if columns else None
         response = requests.get(
             f"{self.base_url}/data/jobs/{job_id}/export/{format}", 
+            params=params,
             headers=self._get_headers()
         )
         if not response.ok:
             raise Exception(f"Export failed: {response.text}")
         return response.content
 
+    
+    def create_export(self, job_id: int, format: str = 'csv', columns: Optional[List[str]] = None) -> Dict:
+        data = {"format": format, "columns": columns}
+        response = requests.post(f"{self.base_url}/data/jobs/{job_id}/exports", json=data, headers=self._get_headers())
+        return self._handle_response(response)
+    
+    def get_export(self, export_id: int) -> Dict:
+        response = requests.get(f"{self.base_url}/data/exports/{export_id}", headers=self._get_headers())
+        return self._handle_response(response)
+    
+    def download_export(self, export_id: int) -> bytes:
+        response = requests.get(f"{self.base_url}/data/exports/{export_id}/download", headers=self._get_headers())
+        if not response.ok:
+            raise Exception(f"Download failed: {response.text}")
+        return response.content
@@ -31,9 +31,11 @@ def format_number(num: int) -> str:
 def get_status_color(status: str) -> str:
     """Get color for job status"""
     colors = {
+        'queued': 'violet',
         'running': 'green',
         'completed': 'blue',
         'failed': 'red',
+        'stopping': 'orange',
         'paused': 'orange',
         'created': 'gray'
     }